@@ -7,7 +7,7 @@ Usage:
     python enrich_restaurants.py --api-key YOUR_GOOGLE_API_KEY
 
 Requirements:
-    pip install requests pandas tqdm
+    pip install 'httpx[http2]' aiolimiter orjson pandas tqdm
 
 The script will:
 1. Read chase_sapphire_restaurants_complete.csv
@@ -18,37 +18,83 @@ The script will:
 """
 
 import argparse
+import asyncio
 import csv
 import json
 import os
-import time
 from datetime import datetime
 from typing import Optional, Dict, Any
 
 try:
-    import requests
+    import httpx
 except ImportError:
-    print("Installing requests...")
-    os.system("pip install requests")
-    import requests
+    print("Installing httpx...")
+    os.system("pip install 'httpx[http2]'")
+    import httpx
 
 try:
-    from tqdm import tqdm
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    print("Installing aiolimiter...")
+    os.system("pip install aiolimiter")
+    from aiolimiter import AsyncLimiter
+
+try:
+    import orjson  # Optional - faster JSON parsing
+except ImportError:
+    orjson = None
+
+try:
+    import pandas as pd
+except ImportError:
+    print("Installing pandas...")
+    os.system("pip install pandas")
+    import pandas as pd
+
+try:
+    from tqdm.asyncio import tqdm
 except ImportError:
     print("Installing tqdm...")
     os.system("pip install tqdm")
-    from tqdm import tqdm
+    from tqdm.asyncio import tqdm
+
+from places_cache import PlacesCache
+
+# Lookups already resolved on a previous run are served from here
+PLACES_CACHE_FILE = "places_cache_enrich.sqlite"
+
+# Input columns read, and the columns of the two output CSVs
+INPUT_FIELDS = ("Name", "City", "Neighborhood", "Cuisine")
+OUTPUT_FIELDS = ("City", "Name", "Cuisine", "Neighborhood", "Address", "Website",
+                 "Lat", "Lon", "Place_ID", "Google_Maps_URL", "Google_Name")
+FAILED_FIELDS = ("City", "Name", "Cuisine", "Neighborhood", "Reason")
+
+# Max in-flight API calls (kept well below the Places API's 100 QPS ceiling)
+MAX_CONCURRENCY = 20
 
 
 class GooglePlacesClient:
     """Client for Google Places API (New)"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[PlacesCache] = None):
         self.api_key = api_key
+        self.cache = cache
         self.base_url = "https://places.googleapis.com/v1/places"
         self.search_url = f"{self.base_url}:searchText"
+        # One pooled client for every lookup, so connections are reused
+        self.client = httpx.AsyncClient(http2=True, timeout=10)
+    
+    async def aclose(self):
+        """Close the underlying HTTP client."""
+        await self.client.aclose()
+    
+    def _cache_key(self, name: str, city: str, neighborhood: str, api: str) -> Optional[str]:
+        """Cache key for a lookup via `api` ("new" or "legacy"), or None when caching is disabled."""
+        if not self.cache:
+            return None
+        return PlacesCache.make_key(name, f"{neighborhood}, {city}", api)
         
-    def search_restaurant(self, name: str, city: str, neighborhood: str = "") -> Optional[Dict[str, Any]]:
+    async def search_restaurant(self, name: str, city: str, neighborhood: str = "") -> Optional[Dict[str, Any]]:
         """
         Search for a restaurant and return place details.
         
@@ -60,6 +106,10 @@ class GooglePlacesClient:
         Returns:
             Dict with place details or None if not found
         """
+        cache_key = self._cache_key(name, city, neighborhood, "new")
+        if cache_key and (cached := self.cache.get(cache_key)) is not None:
+            return cached
+        
         # Build search query - include neighborhood for better accuracy
         if neighborhood and neighborhood != city:
             query = f"{name} restaurant in {neighborhood}, {city}"
@@ -78,7 +128,7 @@ class GooglePlacesClient:
         }
         
         try:
-            response = requests.post(self.search_url, headers=headers, json=payload)
+            response = await self.client.post(self.search_url, headers=headers, json=payload)
             
             # Better error logging
             if response.status_code != 200:
@@ -86,11 +136,11 @@ class GooglePlacesClient:
                 print(f"\n  API Error for '{name}': {response.status_code} - {error_detail}")
                 return None
                 
-            data = response.json()
+            data = orjson.loads(response.content) if orjson else response.json()
             
             if "places" in data and len(data["places"]) > 0:
                 place = data["places"][0]
-                return {
+                result = {
                     "place_id": place.get("id", ""),
                     "google_name": place.get("displayName", {}).get("text", ""),
                     "address": place.get("formattedAddress", ""),
@@ -99,17 +149,24 @@ class GooglePlacesClient:
                     "website": place.get("websiteUri", ""),
                     "google_maps_url": place.get("googleMapsUri", "")
                 }
+                if cache_key:
+                    self.cache.set(cache_key, result)
+                return result
             return None
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:  # ValueError: body wasn't valid JSON
             print(f"\n  API Error for '{name}': {e}")
             return None
     
-    def search_restaurant_legacy(self, name: str, city: str, neighborhood: str = "") -> Optional[Dict[str, Any]]:
+    async def search_restaurant_legacy(self, name: str, city: str, neighborhood: str = "") -> Optional[Dict[str, Any]]:
         """
         Fallback using legacy Places API (Text Search).
         Use this if you have issues with the new API.
         """
+        cache_key = self._cache_key(name, city, neighborhood, "legacy")
+        if cache_key and (cached := self.cache.get(cache_key)) is not None:
+            return cached
+        
         base_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
         
         if neighborhood and neighborhood != city:
@@ -123,15 +180,15 @@ class GooglePlacesClient:
         }
         
         try:
-            response = requests.get(base_url, params=params)
+            response = await self.client.get(base_url, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content) if orjson else response.json()
             
             if data.get("status") == "OK" and data.get("results"):
                 place = data["results"][0]
                 place_id = place.get("place_id", "")
                 
-                return {
+                result = {
                     "place_id": place_id,
                     "google_name": place.get("name", ""),
                     "address": place.get("formatted_address", ""),
@@ -140,20 +197,30 @@ class GooglePlacesClient:
                     "website": "",  # Need separate Place Details call for this
                     "google_maps_url": f"https://www.google.com/maps/place/?q=place_id:{place_id}" if place_id else ""
                 }
+                if cache_key:
+                    self.cache.set(cache_key, result)
+                return result
             return None
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:  # ValueError: body wasn't valid JSON
             print(f"\n  API Error for '{name}': {e}")
             return None
 
 
+def lookup_key(name: str, city: str, neighborhood: str) -> tuple:
+    """Normalized (name, city, neighborhood) identifying one Places lookup."""
+    return (name.lower().strip(), city.lower().strip(), neighborhood.lower().strip())
+
+
 def enrich_restaurants(
     input_file: str,
     output_file: str,
     failed_file: str,
     api_key: str,
-    delay: float = 0.1,
-    use_legacy: bool = False
+    delay: float = 0.02,
+    use_legacy: bool = False,
+    use_cache: bool = True,
+    cache_ttl_days: float = 30
 ):
     """
     Main function to enrich restaurant data.
@@ -163,20 +230,41 @@ def enrich_restaurants(
         output_file: Path to output enriched CSV
         failed_file: Path to save failed lookups
         api_key: Google API key
-        delay: Delay between API calls (seconds)
+        delay: Minimum spacing between API calls (seconds), shared by all in-flight requests
         use_legacy: Use legacy Places API instead of new API
+        use_cache: Reuse results from the on-disk Places cache
+        cache_ttl_days: Age after which cached results are looked up again
     """
-    client = GooglePlacesClient(api_key)
+    return asyncio.run(enrich_restaurants_async(
+        input_file, output_file, failed_file, api_key, delay, use_legacy,
+        use_cache, cache_ttl_days
+    ))
+
+
+async def enrich_restaurants_async(
+    input_file: str,
+    output_file: str,
+    failed_file: str,
+    api_key: str,
+    delay: float = 0.02,
+    use_legacy: bool = False,
+    use_cache: bool = True,
+    cache_ttl_days: float = 30
+):
+    """Async implementation of enrich_restaurants; lookups run concurrently."""
+    cache = PlacesCache(PLACES_CACHE_FILE, ttl_days=cache_ttl_days) if use_cache else None
+    client = GooglePlacesClient(api_key, cache=cache)
     
-    # Read input CSV
-    restaurants = []
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        restaurants = list(reader)
+    # Read input CSV - as plain (name, city, neighborhood, cuisine) tuples
+    df = pd.read_csv(input_file, dtype=str, keep_default_na=False)
+    for column in INPUT_FIELDS:
+        if column not in df.columns:
+            df[column] = ""
+    restaurants = list(df[list(INPUT_FIELDS)].itertuples(index=False, name=None))
     
     print(f"\nLoaded {len(restaurants)} restaurants from {input_file}")
     print(f"Using {'legacy' if use_legacy else 'new'} Google Places API")
-    print(f"Delay between requests: {delay}s")
+    print(f"Delay between requests: {delay}s (up to {MAX_CONCURRENCY} in flight)")
     print("-" * 60)
     
     enriched = []
@@ -184,59 +272,57 @@ def enrich_restaurants(
     
     search_fn = client.search_restaurant_legacy if use_legacy else client.search_restaurant
     
-    for restaurant in tqdm(restaurants, desc="Enriching restaurants"):
-        name = restaurant.get("Name", "")
-        city = restaurant.get("City", "")
-        neighborhood = restaurant.get("Neighborhood", "")
-        cuisine = restaurant.get("Cuisine", "")
-        
-        # Search Google Places
-        result = search_fn(name, city, neighborhood)
+    # Rate limiting - one limiter shared across all concurrent lookups
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    # One request per delay seconds; aiolimiter needs max_rate >= 1, so scale the period, not the rate
+    limiter = AsyncLimiter(1, delay) if delay > 0 else None
+    
+    async def search(name: str, city: str, neighborhood: str) -> Optional[Dict[str, Any]]:
+        async with sem:
+            if limiter:
+                await limiter.acquire()
+            return await search_fn(name, city, neighborhood)
+    
+    # The same restaurant often appears in several lists - look each one up once
+    unique_keys = {}
+    for name, city, neighborhood, _ in restaurants:
+        unique_keys.setdefault(lookup_key(name, city, neighborhood), (name, city, neighborhood))
+    print(f"Unique lookups: {len(unique_keys)} ({len(restaurants) - len(unique_keys)} duplicates skipped)")
+    
+    try:
+        results = await tqdm.gather(*(search(*r) for r in unique_keys.values()), desc="Enriching restaurants")
+    finally:
+        await client.aclose()
+        if cache:
+            cache.close()
+    
+    unique_keys = dict(zip(unique_keys, results))
+    
+    for name, city, neighborhood, cuisine in restaurants:
+        result = unique_keys[lookup_key(name, city, neighborhood)]
         
         if result:
-            enriched_row = {
-                "City": city,
-                "Name": name,
-                "Cuisine": cuisine,
-                "Neighborhood": neighborhood,
-                "Address": result["address"],
-                "Website": result["website"],
-                "Lat": result["lat"],
-                "Lon": result["lon"],
-                "Place_ID": result["place_id"],
-                "Google_Maps_URL": result["google_maps_url"],
-                "Google_Name": result["google_name"]
-            }
-            enriched.append(enriched_row)
+            enriched.append((
+                city, name, cuisine, neighborhood,
+                result["address"], result["website"], result["lat"], result["lon"],
+                result["place_id"], result["google_maps_url"], result["google_name"]
+            ))
         else:
-            failed_row = {
-                "City": city,
-                "Name": name,
-                "Cuisine": cuisine,
-                "Neighborhood": neighborhood,
-                "Reason": "Not found in Google Places"
-            }
-            failed.append(failed_row)
-        
-        # Rate limiting
-        time.sleep(delay)
+            failed.append((city, name, cuisine, neighborhood, "Not found in Google Places"))
     
     # Write enriched CSV
     if enriched:
-        fieldnames = ["City", "Name", "Cuisine", "Neighborhood", "Address", "Website", 
-                      "Lat", "Lon", "Place_ID", "Google_Maps_URL", "Google_Name"]
         with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(f)
+            writer.writerow(OUTPUT_FIELDS)
             writer.writerows(enriched)
         print(f"\n✓ Saved {len(enriched)} enriched restaurants to {output_file}")
     
     # Write failed lookups
     if failed:
-        fieldnames = ["City", "Name", "Cuisine", "Neighborhood", "Reason"]
         with open(failed_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(f)
+            writer.writerow(FAILED_FIELDS)
             writer.writerows(failed)
         print(f"✗ Saved {len(failed)} failed lookups to {failed_file}")
     
@@ -268,8 +354,11 @@ Examples:
         --input my_restaurants.csv \\
         --output enriched.csv
     
+    # Force fresh lookups instead of using cached results
+    python enrich_restaurants.py --api-key YOUR_API_KEY --no-cache
+    
     # Slower rate limiting (if hitting quota)
-    python enrich_restaurants.py --api-key YOUR_API_KEY --delay 0.5
+    python enrich_restaurants.py --api-key YOUR_API_KEY --delay 0.1
 
 API Key Setup:
     1. Go to https://console.cloud.google.com/
@@ -303,14 +392,25 @@ API Key Setup:
     parser.add_argument(
         "--delay",
         type=float,
-        default=0.1,
-        help="Delay between API calls in seconds (default: 0.1)"
+        default=0.02,
+        help="Minimum delay between API calls in seconds (default: 0.02, i.e. 50 QPS)"
     )
     parser.add_argument(
         "--legacy",
         action="store_true",
         help="Use legacy Places API instead of new API"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Don't read or write the on-disk lookup cache ({PLACES_CACHE_FILE})"
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=30,
+        help="Days before a cached lookup is refreshed; 0 always refreshes (default: 30)"
+    )
     
     args = parser.parse_args()
     
@@ -331,7 +431,9 @@ API Key Setup:
         failed_file=args.failed,
         api_key=args.api_key,
         delay=args.delay,
-        use_legacy=args.legacy
+        use_legacy=args.legacy,
+        use_cache=not args.no_cache,
+        cache_ttl_days=args.cache_ttl_days
     )
     
     print(f"\nEnd time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -0,0 +1,70 @@
+"""
+Fetched Page Cache
+==================
+Development-only SQLite cache of fetched pages for scraper.py --dev-cache,
+so iterating on extraction doesn't re-download (or re-render) the same URLs.
+
+Pages fetched with simple requests and with Playwright can differ a lot, so
+the fetch mode is part of the key.
+
+Usage:
+    cache = PageCache(".dev_cache.sqlite", ttl_days=7)
+    key = PageCache.make_key(url, "playwright")
+
+    page = cache.get(key)
+    if page is None:
+        html, text = fetch(url)
+        cache.set(key, html, text)
+"""
+
+import hashlib
+import sqlite3
+import time
+from typing import Optional
+
+
+class PageCache:
+    """SQLite-backed store of (html, text) per fetched URL, with a TTL."""
+
+    def __init__(self, sqlite_path: str, ttl_days: float = 7):
+        self.sqlite_path = sqlite_path
+        self.ttl_seconds = int(ttl_days * 86400)
+        self.conn = sqlite3.connect(sqlite_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, html TEXT, text TEXT, ts INTEGER)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(url: str, mode: str) -> str:
+        """Cache key for a URL fetched in the given mode ("simple" or "playwright").
+
+        URLs are case-sensitive past the host, so unlike Places keys this one
+        isn't lowercased.
+        """
+        return hashlib.sha256(f"{mode}||{url}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return {"html", "text"} for key, or None if missing or expired."""
+        row = self.conn.execute(
+            "SELECT html, text, ts FROM pages WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        html, text, ts = row
+        if time.time() - ts >= self.ttl_seconds:  # ttl_days=0: always refetch
+            return None
+        return {"html": html, "text": text}
+
+    def set(self, key: str, html: str, text: str):
+        """Store a fetched page for key, replacing any previous entry."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (key, html, text, ts) VALUES (?, ?, ?, ?)",
+            (key, html, text, int(time.time()))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
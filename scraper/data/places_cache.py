@@ -0,0 +1,71 @@
+"""
+Google Places Lookup Cache
+==========================
+Persistent SQLite cache for Google Places results, shared by scraper.py and
+enrich_restaurants.py so re-runs over restaurants we've already resolved
+don't hit the API (or spend quota) again.
+
+Usage:
+    cache = PlacesCache("places_cache.sqlite", ttl_days=30)
+    key = PlacesCache.make_key(name, address, api="new")
+
+    result = cache.get(key)
+    if result is None:
+        result = lookup(name, address)
+        if result:
+            cache.set(key, result)
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Optional
+
+
+class PlacesCache:
+    """SQLite-backed key/value store for Places API results, with a TTL."""
+
+    def __init__(self, sqlite_path: str, ttl_days: float = 30):
+        self.sqlite_path = sqlite_path
+        self.ttl_seconds = int(ttl_days * 86400)
+        self.conn = sqlite3.connect(sqlite_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS places (key TEXT PRIMARY KEY, json TEXT, ts INTEGER)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(name: str, address: str, api: str) -> str:
+        """Cache key for a (name, address) lookup - case-insensitive.
+
+        `api` names the endpoint that answered (e.g. "new", "legacy",
+        "findplace"): each runs its own query and returns differently shaped
+        results, so they must never be served for one another.
+        """
+        return hashlib.sha256(f"{api}||{name}||{address}".lower().encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result for key, or None if missing or expired."""
+        row = self.conn.execute(
+            "SELECT json, ts FROM places WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, ts = row
+        if time.time() - ts >= self.ttl_seconds:  # ttl_days=0: always refresh
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: dict):
+        """Store a result for key, replacing any previous entry."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO places (key, json, ts) VALUES (?, ?, ?)",
+            (key, json.dumps(value), int(time.time()))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
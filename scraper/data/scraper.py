@@ -13,10 +13,14 @@ Usage:
     
     # Bulk mode - simple text file with one URL per line
     python scraper.py --bulk urls.txt --output-dir ./results
+    
+    # Bulk mode - 5 URLs at a time in a shared browser
+    python scraper.py --bulk urls.txt --output-dir ./results --parallel 5
 
 Requirements:
-    pip install playwright anthropic requests
+    pip install playwright anthropic 'httpx[http2]' aiolimiter orjson
     playwright install chromium
+    pip install sentence-transformers numpy  # Optional, for the semantic cache
     
 Environment:
     export ANTHROPIC_API_KEY=your_key_here
@@ -24,123 +28,135 @@ Environment:
 """
 
 import argparse
+import asyncio
+import atexit
 import csv
 import json
 import os
 import re
 import sys
-import time
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 from urllib.parse import urlparse
 
 import anthropic
-import requests
-from playwright.sync_api import sync_playwright
+import httpx
+from aiolimiter import AsyncLimiter
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def fetch_page_simple(url: str) -> tuple[str, str]:
-    """Fetch a page using requests (no JS rendering). Works for many sites."""
-    print(f"[*] Fetching (simple mode): {url}")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'Cache-Control': 'max-age=0',
-    }
-    
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
-    
-    html = response.text
-    
-    # Extract text content (rough approximation without BS4)
-    import re
-    text = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<[^>]+>', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    print(f"[OK] Fetched {len(html):,} chars of HTML")
-    return html, text
+from page_cache import PageCache
+from places_cache import PlacesCache
+from semantic_cache import SemanticCache
 
+# Number of URLs processed concurrently in bulk mode (one browser context each)
+MAX_PARALLEL_PAGES = 3
 
-def fetch_page(url: str, wait_seconds: int = 3, use_simple: bool = False) -> tuple[str, str]:
-    """Fetch a page. Uses Playwright by default, falls back to simple requests."""
-    
-    if use_simple:
-        return fetch_page_simple(url)
-    
-    print(f"[*] Fetching: {url}")
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-        )
-        page = context.new_page()
-        
-        try:
-            page.goto(url, wait_until="networkidle", timeout=30000)
-            # Extra wait for JS-heavy sites
-            time.sleep(wait_seconds)
-            
-            # Get the rendered HTML
-            content = page.content()
-            
-            # Also get just the text for potentially cleaner parsing
-            text = page.evaluate("() => document.body.innerText")
-            
-        finally:
-            browser.close()
-    
-    print(f"[OK] Fetched {len(content):,} chars of HTML")
-    return content, text
+# Pages rendered in a browser context before it's recycled, to cap Chromium memory growth
+PAGES_PER_CONTEXT = 20
 
+# Upper bound on rendered page text pulled out of the browser
+MAX_PAGE_TEXT_CHARS = 200000
 
-def extract_locations_with_claude(html: str, text: str, url: str) -> list[dict]:
-    """Use Claude to intelligently extract location data from page content."""
-    
-    client = anthropic.Anthropic()
-    
-    # Truncate if too long (Claude can handle a lot, but let's be reasonable)
-    max_chars = 100000
-    if len(html) > max_chars:
-        html = html[:max_chars] + "\n... [truncated]"
-    if len(text) > max_chars:
-        text = text[:max_chars] + "\n... [truncated]"
-    
-    prompt = f"""Extract all locations/places/businesses from this webpage. This could be restaurants, hotels, shops, attractions, or any other places.
+# A page with this much rendered text is considered loaded
+MIN_RENDERED_CHARS = 2000
 
-URL: {url}
+# Not needed to read a page's text, so never downloaded
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
 
-PAGE TEXT:
-{text}
+# Concurrent in-flight Places lookups, and the overall request rate they share
+PLACES_CONCURRENCY = 20
+PLACES_MAX_QPS = 50
+
+# On-disk cache of Place ID lookups (see places_cache.py)
+PLACES_CACHE_FILE = "places_cache.sqlite"
+
+# Claude extractions, reused for near-duplicate pages (see semantic_cache.py)
+SEMANTIC_CACHE_FILE = "semantic_cache.sqlite"
+
+# Fetched pages, cached only with --dev-cache (see page_cache.py)
+DEV_CACHE_FILE = ".dev_cache.sqlite"
+_DEV_CACHE: Optional[PageCache] = None
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+# Browser-like headers for simple (non-Playwright) fetches
+COMMON_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+}
+
+# Shared keep-alive HTTP/2 client for simple-mode fetches, so repeat hosts skip the TLS handshake
+_HTTP = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(30.0),
+    headers=COMMON_HEADERS,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=20)
+)
+atexit.register(_HTTP.close)
+
+# CSV columns for Google My Maps import, in order
+CANONICAL_FIELDS = (
+    "name", "google_name", "address", "google_address", "neighborhood",
+    "category", "description", "price_range", "rating",
+    "place_id", "google_maps_url", "lat", "lng"
+)
+
+# Prompt budget for page text sent to Claude (~7.5k tokens)
+MAX_PROMPT_CHARS = 30000
+MIN_SEGMENT_CHARS = 40
+MAX_OUTPUT_TOKENS = 4000
+MAX_OUTPUT_TOKENS_RETRY = 8000
 
----
+# Street-address-like text (extract_main_content, looks_like_listing_page)
+_ADDRESS_RE = re.compile(
+    r'\b\d{1,5}\s+[A-Z][\w\s]{2,30}\s+(?:St(?:reet)?|Ave(?:nue)?|Rd|Road|Blvd|Way|Dr(?:ive)?|Ln|Lane|Pl|Place)\b'
+)
+
+# Pages with fewer addresses than this, and shorter than MIN_LISTING_CHARS,
+# are assumed to be errors/paywalls and skipped without calling Claude
+MIN_LISTING_ADDRESSES = 3
+MIN_LISTING_CHARS = 1500
+
+# Filename slugs (slugify)
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+
+# Static system prompt for extract_locations_with_claude. Kept above Anthropic's
+# 1024-token minimum so it can be served from the prompt cache across a bulk run.
+EXTRACTION_INSTRUCTIONS = """You extract structured location data from the text of a webpage. The user message contains the page URL followed by the rendered page text. The page could list restaurants, hotels, bars, shops, attractions, or any other places.
+
+Extract all locations/places/businesses from the page.
 
 For each location found, extract whatever information is available:
 - name (required)
 - address (if available)
-- neighborhood/area (if available) 
+- neighborhood/area (if available)
 - cuisine/category/type (if available)
 - description (brief, if available)
 - price_range (if available)
 - rating (if available)
 
 Return ONLY valid JSON in this exact format, no other text:
-{{
+{
   "locations": [
-    {{
+    {
       "name": "Example Place",
       "address": "123 Main St, New York, NY 10001",
       "neighborhood": "SoHo",
@@ -148,39 +164,420 @@ Return ONLY valid JSON in this exact format, no other text:
       "description": "Brief description",
       "price_range": "$$$",
       "rating": "4.5"
-    }}
+    }
   ],
-  "source_url": "{url}",
+  "source_url": "<the URL from the user message>",
   "total_count": 10
-}}
+}
 
 Notes:
 - Include ALL locations found on the page
 - If a field is not available, use null
 - For address, include city/state if shown
-- Be thorough - don't miss any locations listed"""
+- Be thorough - don't miss any locations listed
+
+Field guidelines:
+- name: The place's own name as shown on the page, without rankings or list numbering ("1. Carbone" becomes "Carbone"). Keep punctuation and accents that are part of the name ("L'Artusi", "Café Boulud").
+- address: The most complete street address on the page. Append the city and state when the page makes them clear (for example the page is a city guide), even if each entry only shows a street. Do not invent zip codes.
+- neighborhood: A district, neighborhood, or area name ("West Village", "Wicker Park", "Downtown"). Use null if only a city is given.
+- category: Cuisine for restaurants ("Japanese", "Steakhouse", "Contemporary American"), otherwise the kind of place ("Cocktail Bar", "Boutique Hotel", "Museum").
+- description: One short sentence summarising what the page says about the place. Do not copy whole paragraphs.
+- price_range: Keep the page's own notation ("$$", "$$$$", "$30-50"). Use null if absent.
+- rating: The page's rating as a string ("4.5", "3 Michelin stars"). Use null if absent.
+
+Things to ignore:
+- Navigation menus, footers, cookie banners, newsletter sign-ups, and ads.
+- "Related articles", "You might also like", and other links to different pages.
+- Authors, photographers, and publications credited on the page.
+- Duplicate mentions of the same place; list each place once, merging details from every mention.
+
+Example 1 - a city guide listing with street addresses only:
+PAGE TEXT:
+The 3 Best Pizza Spots in Chicago
+1. Pequod's Pizza - 2207 N Clybourn Ave. Caramelized-crust deep dish. $$
+2. Paulie Gee's Logan Square - 2451 N Milwaukee Ave. Detroit-style squares.
+
+Output:
+{
+  "locations": [
+    {
+      "name": "Pequod's Pizza",
+      "address": "2207 N Clybourn Ave, Chicago, IL",
+      "neighborhood": null,
+      "category": "Pizza",
+      "description": "Deep dish pizza known for its caramelized crust.",
+      "price_range": "$$",
+      "rating": null
+    },
+    {
+      "name": "Paulie Gee's Logan Square",
+      "address": "2451 N Milwaukee Ave, Chicago, IL",
+      "neighborhood": "Logan Square",
+      "category": "Pizza",
+      "description": "Detroit-style square pizza.",
+      "price_range": null,
+      "rating": null
+    }
+  ],
+  "source_url": "https://example.com/chicago-pizza",
+  "total_count": 2
+}
+
+Example 2 - a reservation platform listing with neighborhoods and ratings:
+PAGE TEXT:
+Sapphire Reserve Exclusive Tables - New York
+Don Angie  Italian  West Village  4.8 (2,103)  $$$
+Reserve now
+Tatiana by Kwame Onwuachi  Contemporary American  Upper West Side  4.7 (987)  $$$$
+
+Output:
+{
+  "locations": [
+    {
+      "name": "Don Angie",
+      "address": null,
+      "neighborhood": "West Village",
+      "category": "Italian",
+      "description": null,
+      "price_range": "$$$",
+      "rating": "4.8"
+    },
+    {
+      "name": "Tatiana by Kwame Onwuachi",
+      "address": null,
+      "neighborhood": "Upper West Side",
+      "category": "Contemporary American",
+      "description": null,
+      "price_range": "$$$$",
+      "rating": "4.7"
+    }
+  ],
+  "source_url": "https://example.com/sapphire-reserve/new-york-city",
+  "total_count": 2
+}
+
+If the page contains no locations at all (an error page, a login wall, an article with no places), return:
+{"locations": [], "source_url": "<the URL from the user message>", "total_count": 0}"""
+
+
+def loads_json(data):
+    """Parse JSON from str or bytes, with orjson when available."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps_json_pretty(obj) -> bytes:
+    """Serialize to 2-space-indented UTF-8 JSON, with orjson when available."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def _find_close_tag(html: str, tag: str, start: int) -> int:
+    """Find the first ``</tag>`` (case-insensitive) at or after start, or -1."""
+    close = f"</{tag}>"
+    pos = html.find('</', start)
+    while pos != -1:
+        if html[pos:pos + len(close)].lower() == close:
+            return pos
+        pos = html.find('</', pos + 2)
+    return -1
+
+
+def _strip_html(html: str) -> str:
+    """
+    Convert HTML to whitespace-collapsed text, dropping <script>/<style> bodies.
+    
+    Walks the markup with str.find instead of DOTALL regexes, so it stays
+    linear on huge or malformed pages (e.g. a <script> with no end tag).
+    """
+    parts = []
+    unclosed = set()  # Tags with no end tag past some point; don't rescan for them
+    pos = 0
+    
+    while True:
+        lt = html.find('<', pos)
+        if lt == -1:
+            break
+        gt = html.find('>', lt + 1)
+        if gt == -1:
+            break
+        if gt == lt + 1:
+            # "<>" isn't a tag, keep it as text
+            parts.append(html[pos:gt])
+            pos = gt
+            continue
+        
+        parts.append(html[pos:lt])
+        
+        name = html[lt + 1:lt + 7].lower()
+        tag = 'script' if name == 'script' else 'style' if name.startswith('style') else None
+        if tag and tag not in unclosed:
+            end = _find_close_tag(html, tag, gt + 1)
+            if end != -1:
+                # Skip the whole element; no separator, matching the old regex behavior
+                pos = end + len(tag) + 3
+                continue
+            unclosed.add(tag)
+        
+        parts.append(' ')
+        pos = gt + 1
+    
+    parts.append(html[pos:])
+    return ' '.join(''.join(parts).split())
+
+
+def fetch_page_simple(url: str) -> tuple[str, str]:
+    """Fetch a page over plain HTTP (no JS rendering). Works for many sites."""
+    print(f"[*] Fetching (simple mode): {url}")
+    
+    response = _HTTP.get(url)
+    response.raise_for_status()
+    
+    html = response.text
+    
+    # Extract text content (rough approximation without BS4)
+    text = _strip_html(html)
+    
+    print(f"[OK] Fetched {len(html):,} chars of HTML")
+    return html, text
+
+
+async def _block_heavy_resources(route):
+    """Abort requests for images, fonts, etc. - only the page text is used."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class PlaywrightSession:
+    """
+    One Chromium instance shared by every page fetched inside the session.
+    
+    Pages borrow a BrowserContext from a small pool (one per concurrent slot).
+    Each context is closed and replaced after ``pages_per_context`` pages, so
+    long bulk runs don't accumulate Chromium memory in a single context.
+    
+    Usage:
+        async with PlaywrightSession(max_contexts=3) as session:
+            async with session.new_page() as page:
+                await page.goto(url)
+    """
+    
+    def __init__(self, max_contexts: int = 1, pages_per_context: int = PAGES_PER_CONTEXT):
+        self.max_contexts = max_contexts
+        self.pages_per_context = pages_per_context
+        self._slots = asyncio.Semaphore(max_contexts)
+        self._idle = []   # Contexts not currently in use
+        self._uses = {}   # Context -> pages opened in it so far
+        self._playwright = None
+        self.browser = None
+    
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(headless=True)
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.browser.close()
+        await self._playwright.stop()
+    
+    @asynccontextmanager
+    async def new_page(self):
+        """Open a page in a pooled context; the page is closed on exit."""
+        async with self._slots:
+            if self._idle:
+                context = self._idle.pop()
+            else:
+                context = await self.browser.new_context(user_agent=USER_AGENT)
+                await context.route("**/*", _block_heavy_resources)
+                self._uses[context] = 0
+            
+            page = None
+            try:
+                page = await context.new_page()
+                yield page
+            finally:
+                if page:
+                    await page.close()
+                self._uses[context] += 1
+                if self._uses[context] >= self.pages_per_context:
+                    del self._uses[context]
+                    await context.close()
+                else:
+                    self._idle.append(context)
+
+
+def install_dev_cache(path: str = DEV_CACHE_FILE, ttl_days: float = 7):
+    """Cache fetched pages on disk so repeated development runs skip the fetch."""
+    global _DEV_CACHE
+    _DEV_CACHE = PageCache(path, ttl_days=ttl_days)
+
+
+async def fetch_page(url: str, wait_seconds: int = 5, use_simple: bool = False,
+                     session: Optional[PlaywrightSession] = None,
+                     keep_html: bool = False) -> tuple[str, str]:
+    """Fetch a page and return (html, text). Uses Playwright by default, falls back to simple requests.
+    
+    Only the text is used for extraction, so html is "" unless ``keep_html``
+    is set. Pass a ``session`` to reuse an already-running browser; otherwise
+    a browser is launched just for this call.
+    """
+    
+    if _DEV_CACHE is None:
+        return await _fetch_page(url, wait_seconds, use_simple, session, keep_html)
+    
+    cache_key = PageCache.make_key(url, "simple" if use_simple else "playwright")
+    cached = _DEV_CACHE.get(cache_key)
+    if cached and (cached["html"] or not keep_html):
+        print(f"[*] Using dev-cached page: {url}")
+        return cached["html"], cached["text"]
+    
+    html, text = await _fetch_page(url, wait_seconds, use_simple, session, keep_html)
+    _DEV_CACHE.set(cache_key, html, text)
+    return html, text
+
+
+async def _fetch_page(url: str, wait_seconds: int, use_simple: bool,
+                      session: Optional[PlaywrightSession], keep_html: bool) -> tuple[str, str]:
+    """Uncached implementation of fetch_page."""
+    
+    if use_simple:
+        html, text = await asyncio.to_thread(fetch_page_simple, url)
+        return (html if keep_html else ""), text
+    
+    if session is None:
+        async with PlaywrightSession() as session:
+            return await _fetch_page(url, wait_seconds, use_simple, session, keep_html)
+    
+    print(f"[*] Fetching: {url}")
+    
+    async with session.new_page() as page:
+        # Listing content is usually in the initial DOM; ad-heavy sites can take
+        # 10s+ to reach networkidle, so only fall back to it for sparse pages
+        await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+        # --wait 0 means no extra wait (a Playwright timeout of 0 would mean "forever")
+        if wait_seconds > 0:
+            try:
+                await page.wait_for_function(
+                    f"() => document.body && document.body.innerText.length > {MIN_RENDERED_CHARS}",
+                    timeout=wait_seconds * 1000
+                )
+            except PlaywrightTimeoutError:
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=5000)
+                except PlaywrightTimeoutError:
+                    pass
+        
+        # Truncate in the browser so only a bounded string crosses the CDP connection
+        text = await page.evaluate(f"() => document.body.innerText.slice(0, {MAX_PAGE_TEXT_CHARS})")
+        
+        # The full HTML is only needed for debugging
+        html = await page.content() if keep_html else ""
+    
+    print(f"[OK] Fetched {len(text):,} chars of text")
+    return html, text
+
+
+def looks_like_listing_page(text: str) -> bool:
+    """Cheap check that a page could plausibly list places, before paying for a Claude call."""
+    if len(text) >= MIN_LISTING_CHARS:
+        return True
+    
+    matches = 0
+    for _ in _ADDRESS_RE.finditer(text):
+        matches += 1
+        if matches >= MIN_LISTING_ADDRESSES:
+            return True
+    return False
+
+
+def extract_main_content(text: str) -> str:
+    """
+    Strip boilerplate from page text that's too long for the prompt budget.
+    
+    Drops short paragraphs (nav links, buttons, footers) unless they look
+    like an address or sit right before one, e.g. a place name followed by
+    its street address. Text already within budget is returned unchanged.
+    """
+    if len(text) <= MAX_PROMPT_CHARS:
+        return text
+    
+    segments = [seg.strip() for seg in text.split("\n\n")]
+    kept = []
+    for i, seg in enumerate(segments):
+        if not seg:
+            continue
+        if len(seg) >= MIN_SEGMENT_CHARS or _ADDRESS_RE.search(seg):
+            kept.append(seg)
+        elif i + 1 < len(segments) and _ADDRESS_RE.search(segments[i + 1]):
+            kept.append(seg)
+    return "\n\n".join(kept)
+
+
+def extract_locations_with_claude(text: str, url: str,
+                                  semantic_cache: Optional[SemanticCache] = None) -> list[dict]:
+    """Use Claude to intelligently extract location data from the page text."""
+    
+    client = anthropic.Anthropic()
+    
+    # Drop boilerplate, then truncate - listings are near the top of the page,
+    # and every extra char costs input tokens and time-to-first-token
+    text = extract_main_content(text)
+    if len(text) > MAX_PROMPT_CHARS:
+        text = text[:MAX_PROMPT_CHARS] + "\n... [truncated]"
+    
+    # A near-identical page from this site was already extracted - reuse it
+    if semantic_cache:
+        cached = semantic_cache.get(url, text)
+        if cached is not None:
+            print(f"[OK] Reused {len(cached)} locations from an earlier fetch of this page")
+            return cached
+    
+    user_message = f"""URL: {url}
+
+PAGE TEXT:
+{text}"""
 
     print("[*] Asking Claude to extract locations...")
     
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=8000,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    # The instructions are identical for every page, so mark them cacheable;
+    # only the page text is billed and processed at full price on repeat calls
+    def ask(max_tokens: int):
+        return client.messages.create(
+            model="claude-sonnet-4-20250514",
+            max_tokens=max_tokens,
+            system=[{
+                "type": "text",
+                "text": EXTRACTION_INSTRUCTIONS,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            messages=[{"role": "user", "content": user_message}]
+        )
+    
+    response = ask(MAX_OUTPUT_TOKENS)
+    if response.stop_reason == "max_tokens":
+        # Unusually long listing - a truncated JSON answer is useless, so retry with more room
+        print("[*] Response hit the token limit, retrying with a larger budget...")
+        response = ask(MAX_OUTPUT_TOKENS_RETRY)
     
     response_text = response.content[0].text
     
     # Parse JSON from response
     try:
-        # Handle potential markdown code blocks
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
+        # The answer is a single JSON object, possibly wrapped in a markdown fence
+        # or a sentence of preamble - slice from the first '{' to the last '}'
+        start = response_text.find('{')
+        end = response_text.rfind('}')
+        if start != -1 and end > start:
+            response_text = response_text[start:end + 1]
         
-        data = json.loads(response_text)
+        data = loads_json(response_text)
         locations = data.get("locations", [])
         print(f"[OK] Extracted {len(locations)} locations")
+        
+        if semantic_cache and locations:
+            semantic_cache.set(url, text, locations)
         return locations
         
     except json.JSONDecodeError as e:
@@ -189,8 +586,15 @@ Notes:
         return []
 
 
-def get_place_id(name: str, address: str, api_key: str) -> Optional[dict]:
-    """Look up Google Place ID for a location."""
+async def get_place_id(client: httpx.AsyncClient, name: str, address: str, api_key: str,
+                       cache: Optional[PlacesCache] = None) -> Optional[dict]:
+    """Look up Google Place ID for a location, consulting the on-disk cache first."""
+    
+    if cache:
+        cache_key = PlacesCache.make_key(name, address, "findplace")
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
     
     query = f"{name} {address}" if address else name
     url = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
@@ -203,12 +607,12 @@ def get_place_id(name: str, address: str, api_key: str) -> Optional[dict]:
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
+        response = await client.get(url, params=params)
+        data = loads_json(response.content)
         
         if data.get("candidates"):
             candidate = data["candidates"][0]
-            return {
+            result = {
                 "place_id": candidate.get("place_id"),
                 "google_name": candidate.get("name"),
                 "google_address": candidate.get("formatted_address"),
@@ -216,33 +620,77 @@ def get_place_id(name: str, address: str, api_key: str) -> Optional[dict]:
                 "lng": candidate.get("geometry", {}).get("location", {}).get("lng"),
                 "google_maps_url": f"https://www.google.com/maps/place/?q=place_id:{candidate.get('place_id')}"
             }
+            if cache:
+                cache.set(cache_key, result)
+            return result
     except Exception as e:
         print(f"  [WARN] Places API error for {name}: {e}")
     
     return None
 
 
-def enrich_with_place_ids(locations: list[dict], api_key: str) -> list[dict]:
-    """Add Google Place IDs to all locations."""
+class PlacesSession:
+    """
+    HTTP/2 client plus concurrency and QPS caps for Places lookups.
+    
+    Share one session across every pipeline in a run - the caps only hold
+    run-wide if all lookups go through the same semaphore and limiter.
+    
+    Usage:
+        async with PlacesSession() as places:
+            await enrich_all(locations, api_key, places=places)
+    """
+    
+    def __init__(self, concurrency: int = PLACES_CONCURRENCY, max_qps: float = PLACES_MAX_QPS):
+        # Places API allows 100 QPS but let's be nice
+        self.sem = asyncio.Semaphore(concurrency)
+        self.limiter = AsyncLimiter(max_rate=max_qps, time_period=1)
+        self.client = None
+    
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(http2=True, timeout=10)
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+
+async def enrich_all(locations: list[dict], api_key: str,
+                     cache: Optional[PlacesCache] = None,
+                     on_result: Optional[Callable[[dict], None]] = None,
+                     places: Optional[PlacesSession] = None) -> list[dict]:
+    """
+    Add Google Place IDs to all locations, looking them up concurrently.
+    
+    If given, ``on_result`` is called with each location as soon as its
+    lookup finishes (in completion order), e.g. to stream it to a CSV.
+    Pass a shared ``places`` session when several calls run at once;
+    otherwise one is opened for this call.
+    """
     
     print(f"\n[*] Looking up Place IDs for {len(locations)} locations...")
     
-    for i, loc in enumerate(locations):
-        name = loc.get("name", "")
-        address = loc.get("address") or loc.get("neighborhood") or ""
+    async with AsyncExitStack() as stack:
+        if places is None:
+            places = await stack.enter_async_context(PlacesSession())
         
-        print(f"  [{i+1}/{len(locations)}] {name}...", end=" ")
-        
-        place_data = get_place_id(name, address, api_key)
-        
-        if place_data:
-            loc.update(place_data)
-            print(f"[OK]")
-        else:
-            print(f"[NOT FOUND]")
+        async def lookup(i: int, loc: dict):
+            name = loc.get("name", "")
+            address = loc.get("address") or loc.get("neighborhood") or ""
+            
+            async with places.sem, places.limiter:
+                place_data = await get_place_id(places.client, name, address, api_key, cache)
+            
+            if place_data:
+                loc.update(place_data)
+                print(f"  [{i+1}/{len(locations)}] {name}... [OK]")
+            else:
+                print(f"  [{i+1}/{len(locations)}] {name}... [NOT FOUND]")
+            
+            if on_result:
+                on_result(loc)
         
-        # Rate limiting - Places API allows 100 QPS but let's be nice
-        time.sleep(0.1)
+        await asyncio.gather(*(lookup(i, loc) for i, loc in enumerate(locations)))
     
     found = sum(1 for loc in locations if loc.get("place_id"))
     print(f"\n[OK] Found Place IDs for {found}/{len(locations)} locations")
@@ -250,48 +698,52 @@ def enrich_with_place_ids(locations: list[dict], api_key: str) -> list[dict]:
     return locations
 
 
-def export_csv(locations: list[dict], output_file: str):
-    """Export locations to CSV for Google My Maps import."""
-    
-    # Determine all unique fields across locations
-    all_fields = set()
-    for loc in locations:
-        all_fields.update(loc.keys())
-    
-    # Preferred column order
-    preferred_order = [
-        "name", "google_name", "address", "google_address", "neighborhood",
-        "category", "description", "price_range", "rating",
-        "place_id", "google_maps_url", "lat", "lng"
-    ]
+def enrich_with_place_ids(locations: list[dict], api_key: str,
+                          cache: Optional[PlacesCache] = None) -> list[dict]:
+    """Add Google Place IDs to all locations."""
+    return asyncio.run(enrich_all(locations, api_key, cache))
+
+
+def location_row(loc: dict) -> list:
+    """A location's CSV row, in CANONICAL_FIELDS order."""
+    return [loc.get(field) for field in CANONICAL_FIELDS]
+
+
+@contextmanager
+def stream_export_csv(output_file: str):
+    """
+    Open a CSV for Google My Maps import and yield a csv.writer for its rows.
     
-    # Build final field list
-    fields = [f for f in preferred_order if f in all_fields]
-    fields += [f for f in sorted(all_fields) if f not in fields]
+    The header is already written; pass rows through location_row.
+    """
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(locations)
+        writer = csv.writer(f)
+        writer.writerow(CANONICAL_FIELDS)
+        yield writer
     
     print(f"\n[SAVED] Exported to: {output_file}")
 
 
+def export_csv(locations: list[dict], output_file: str):
+    """Export locations to CSV for Google My Maps import."""
+    
+    with stream_export_csv(output_file) as writer:
+        writer.writerows(map(location_row, locations))
+
+
 def export_json(locations: list[dict], output_file: str):
     """Export locations to JSON."""
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(locations, f, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(dumps_json_pretty(locations))
     
     print(f"[SAVED] Exported to: {output_file}")
 
 
 def slugify(text: str) -> str:
     """Convert text to a safe filename."""
-    text = text.lower().strip()
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '-', text)
-    return text
+    return _SLUG_DASH.sub('-', _SLUG_STRIP.sub('', text.lower().strip()))
 
 
 def extract_name_from_url(url: str) -> str:
@@ -336,26 +788,41 @@ def load_bulk_urls(filepath: str) -> list[dict]:
     return urls
 
 
-def process_single_url(url: str, output_file: str, places_api_key: Optional[str], 
-                       wait_seconds: int, export_json: bool, use_simple: bool = False) -> bool:
+async def process_single_url(url: str, output_file: str, places_api_key: Optional[str], 
+                             wait_seconds: int, export_json: bool, use_simple: bool = False,
+                             session: Optional[PlaywrightSession] = None,
+                             cache: Optional[PlacesCache] = None,
+                             semantic_cache: Optional[SemanticCache] = None,
+                             keep_html: bool = False, force_llm: bool = False,
+                             places: Optional[PlacesSession] = None) -> bool:
     """Process a single URL. Returns True on success."""
     try:
         # Fetch the page
-        html, text = fetch_page(url, wait_seconds=wait_seconds, use_simple=use_simple)
+        html, text = await fetch_page(url, wait_seconds=wait_seconds, use_simple=use_simple,
+                                      session=session, keep_html=keep_html)
+        if keep_html:
+            export_html_file(html, output_file.rsplit('.', 1)[0] + '.html')
+        
+        if not force_llm and not looks_like_listing_page(text):
+            print(f"[SKIP] No listings detected on {url}")
+            return False
         
         # Extract locations with Claude
-        locations = extract_locations_with_claude(html, text, url)
+        locations = await asyncio.to_thread(extract_locations_with_claude, text, url,
+                                            semantic_cache)
         
         if not locations:
             print(f"[WARN] No locations found for {url}")
             return False
         
-        # Enrich with Place IDs if API key provided
-        if places_api_key:
-            locations = enrich_with_place_ids(locations, places_api_key)
-        
-        # Export results
-        export_csv(locations, output_file)
+        # Enrich with Place IDs if API key provided, writing each row as it's ready
+        with stream_export_csv(output_file) as writer:
+            if places_api_key:
+                await enrich_all(locations, places_api_key, cache,
+                                 on_result=lambda loc: writer.writerow(location_row(loc)),
+                                 places=places)
+            else:
+                writer.writerows(map(location_row, locations))
         
         if export_json:
             json_file = output_file.rsplit('.', 1)[0] + '.json'
@@ -368,21 +835,47 @@ def process_single_url(url: str, output_file: str, places_api_key: Optional[str]
         return False
 
 
+def export_html_file(html: str, output_file: str):
+    """Save the fetched page HTML (for debugging extractions)."""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"[SAVED] Exported to: {output_file}")
+
+
 def export_json_file(locations: list[dict], output_file: str):
     """Export locations to JSON."""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(locations, f, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(dumps_json_pretty(locations))
     print(f"[SAVED] Exported to: {output_file}")
 
 
 def run_bulk_mode(bulk_file: str, output_dir: str, places_api_key: Optional[str],
-                  wait_seconds: int, export_json: bool, delay_between: int, use_simple: bool = False):
+                  wait_seconds: int, export_json: bool, delay_between: int, use_simple: bool = False,
+                  max_parallel: int = MAX_PARALLEL_PAGES, cache: Optional[PlacesCache] = None,
+                  semantic_cache: Optional[SemanticCache] = None, keep_html: bool = False,
+                  force_llm: bool = False):
     """Process multiple URLs from a file."""
+    asyncio.run(run_bulk_mode_async(bulk_file, output_dir, places_api_key, wait_seconds,
+                                    export_json, delay_between, use_simple, max_parallel, cache,
+                                    semantic_cache, keep_html, force_llm))
+
+
+async def run_bulk_mode_async(bulk_file: str, output_dir: str, places_api_key: Optional[str],
+                              wait_seconds: int, export_json: bool, delay_between: int,
+                              use_simple: bool = False, max_parallel: int = MAX_PARALLEL_PAGES,
+                              cache: Optional[PlacesCache] = None,
+                              semantic_cache: Optional[SemanticCache] = None,
+                              keep_html: bool = False, force_llm: bool = False):
+    """Process multiple URLs concurrently, sharing one browser across all of them."""
+    
+    # A zero-slot semaphore/session would leave every URL waiting forever
+    max_parallel = max(1, max_parallel)
     
     # Load URLs
     urls = load_bulk_urls(bulk_file)
     print(f"[*] Loaded {len(urls)} URLs from {bulk_file}")
-    print(f"[*] Mode: {'Simple (requests)' if use_simple else 'Full (Playwright)'}\n")
+    print(f"[*] Mode: {'Simple (HTTP)' if use_simple else 'Full (Playwright)'}")
+    print(f"[*] Parallel: {max_parallel}\n")
     
     if not urls:
         print("[ERR] No valid URLs found in file")
@@ -396,27 +889,55 @@ def run_bulk_mode(bulk_file: str, output_dir: str, places_api_key: Optional[str]
     failed = 0
     failed_urls = []
     
-    for i, item in enumerate(urls):
+    sem = asyncio.Semaphore(max_parallel)
+    
+    async def process_one(i: int, item: dict, session: Optional[PlaywrightSession],
+                          places: Optional[PlacesSession]) -> tuple[dict, bool]:
         url = item['url']
         name = item['name']
         output_file = os.path.join(output_dir, f"{name}.csv")
         
-        print(f"\n{'='*60}")
-        print(f"[{i+1}/{len(urls)}] Processing: {name}")
-        print(f"    URL: {url}")
-        print(f"    Output: {output_file}")
-        print('='*60)
-        
-        if process_single_url(url, output_file, places_api_key, wait_seconds, export_json, use_simple):
-            success += 1
-        else:
-            failed += 1
-            failed_urls.append(url)
-        
-        # Delay between requests to be nice to servers
-        if i < len(urls) - 1:
-            print(f"\n[*] Waiting {delay_between}s before next request...")
-            time.sleep(delay_between)
+        async with sem:
+            # Delay between URLs handled by the same slot, to be nice to servers
+            if i >= max_parallel:
+                await asyncio.sleep(delay_between)
+            
+            print(f"\n{'='*60}")
+            print(f"[{i+1}/{len(urls)}] Processing: {name}")
+            print(f"    URL: {url}")
+            print(f"    Output: {output_file}")
+            print('='*60)
+            
+            ok = await process_single_url(url, output_file, places_api_key, wait_seconds,
+                                          export_json, use_simple, session=session, cache=cache,
+                                          semantic_cache=semantic_cache, keep_html=keep_html,
+                                          force_llm=force_llm, places=places)
+        return item, ok
+    
+    async def process_all(session: Optional[PlaywrightSession]):
+        nonlocal success, failed
+        async with AsyncExitStack() as stack:
+            # One Places session for all pipelines, so its QPS cap is run-wide
+            places = await stack.enter_async_context(PlacesSession()) if places_api_key else None
+            tasks = [asyncio.create_task(process_one(i, item, session, places))
+                     for i, item in enumerate(urls)]
+            
+            # Each URL's CSV is already written by its own pipeline; record results
+            # in completion order so progress reflects what has actually finished
+            for done, next_result in enumerate(asyncio.as_completed(tasks), 1):
+                item, ok = await next_result
+                if ok:
+                    success += 1
+                else:
+                    failed += 1
+                    failed_urls.append(item['url'])
+                print(f"\n[{done}/{len(urls)} done] {item['name']}: {'OK' if ok else 'FAILED'}")
+    
+    if use_simple:
+        await process_all(None)
+    else:
+        async with PlaywrightSession(max_contexts=max_parallel) as session:
+            await process_all(session)
     
     # Summary
     print(f"\n{'='*60}")
@@ -454,14 +975,22 @@ Examples:
     # Bulk mode
     parser.add_argument("--bulk", metavar="FILE", help="CSV or text file with URLs for bulk processing")
     parser.add_argument("--output-dir", default="./output", help="Output directory for bulk mode (default: ./output)")
-    parser.add_argument("--delay", type=int, default=5, help="Seconds to wait between URLs in bulk mode (default: 5)")
+    parser.add_argument("--delay", type=int, default=5, help="Seconds each parallel slot waits between URLs in bulk mode (default: 5)")
+    parser.add_argument("--parallel", type=int, default=MAX_PARALLEL_PAGES, help=f"URLs to process concurrently in bulk mode (default: {MAX_PARALLEL_PAGES})")
     
     # Common options
     parser.add_argument("-o", "--output", default="locations.csv", help="Output filename for single mode (default: locations.csv)")
     parser.add_argument("--json", action="store_true", help="Also export as JSON")
+    parser.add_argument("--keep-html", action="store_true", help="Also save the fetched page HTML (for debugging)")
+    parser.add_argument("--dev-cache", action="store_true", help=f"Cache fetched pages for 7 days in {DEV_CACHE_FILE} (for iterating on the scraper)")
+    parser.add_argument("--force-llm", action="store_true", help="Send every page to Claude, even ones that don't look like a listing")
     parser.add_argument("--no-place-ids", action="store_true", help="Skip Google Place ID lookup")
-    parser.add_argument("--wait", type=int, default=3, help="Seconds to wait for page to render (default: 3)")
-    parser.add_argument("--simple", action="store_true", help="Use simple requests instead of Playwright (faster, no browser needed, but no JS rendering)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the on-disk Place ID cache")
+    parser.add_argument("--cache-ttl-days", type=float, default=30, help="Days before a cached Place ID lookup is refreshed; 0 always refreshes (default: 30)")
+    parser.add_argument("--semantic-cache", action="store_true", help="Reuse Claude's extraction when a page is nearly identical to an earlier fetch of the same URL")
+    parser.add_argument("--semantic-cache-ttl-days", type=float, default=7, help="Days a cached extraction can be reused for similar pages (default: 7)")
+    parser.add_argument("--wait", type=int, default=5, help="Max seconds to wait for page content to render (default: 5)")
+    parser.add_argument("--simple", action="store_true", help="Use plain HTTP requests instead of Playwright (faster, no browser needed, but no JS rendering)")
     
     args = parser.parse_args()
     
@@ -472,6 +1001,9 @@ Examples:
     if args.bulk and args.url:
         parser.error("Cannot use both URL and --bulk mode. Choose one.")
     
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+    
     # Check for required API keys
     if not os.environ.get("ANTHROPIC_API_KEY"):
         print("[ERR] Please set ANTHROPIC_API_KEY environment variable")
@@ -485,6 +1017,17 @@ Examples:
     elif args.no_place_ids:
         places_api_key = None
     
+    if args.dev_cache:
+        install_dev_cache()
+    
+    cache = None
+    if places_api_key and not args.no_cache:
+        cache = PlacesCache(PLACES_CACHE_FILE, ttl_days=args.cache_ttl_days)
+    
+    semantic_cache = None
+    if args.semantic_cache:
+        semantic_cache = SemanticCache(SEMANTIC_CACHE_FILE, ttl_days=args.semantic_cache_ttl_days)
+    
     # Run appropriate mode
     if args.bulk:
         run_bulk_mode(
@@ -494,19 +1037,32 @@ Examples:
             wait_seconds=args.wait,
             export_json=args.json,
             delay_between=args.delay,
-            use_simple=args.simple
+            use_simple=args.simple,
+            max_parallel=args.parallel,
+            cache=cache,
+            semantic_cache=semantic_cache,
+            keep_html=args.keep_html,
+            force_llm=args.force_llm
         )
     else:
         # Single URL mode
-        html, text = fetch_page(args.url, wait_seconds=args.wait, use_simple=args.simple)
-        locations = extract_locations_with_claude(html, text, args.url)
+        html, text = asyncio.run(fetch_page(args.url, wait_seconds=args.wait, use_simple=args.simple,
+                                            keep_html=args.keep_html))
+        if args.keep_html:
+            export_html_file(html, args.output.rsplit('.', 1)[0] + '.html')
+        
+        if not args.force_llm and not looks_like_listing_page(text):
+            print("[ERR] No listings detected on the page (use --force-llm to try anyway)")
+            sys.exit(1)
+        
+        locations = extract_locations_with_claude(text, args.url, semantic_cache)
         
         if not locations:
             print("[ERR] No locations found")
             sys.exit(1)
         
         if places_api_key:
-            locations = enrich_with_place_ids(locations, places_api_key)
+            locations = enrich_with_place_ids(locations, places_api_key, cache)
         
         export_csv(locations, args.output)
         
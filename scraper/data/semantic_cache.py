@@ -0,0 +1,137 @@
+"""
+Semantic Cache for Claude Extractions
+=====================================
+Remembers the locations Claude extracted from each page, keyed by an
+embedding of the page text. A later fetch of the same page (host + path)
+whose text is nearly identical - e.g. a weekly re-scrape with minor edits -
+gets the stored locations back instead of another Claude call.
+
+Pages are only ever compared with earlier fetches of the same host and path:
+sites like OpenTable serve dozens of city pages from one template, and those
+must never share results. The text is embedded in chunks the model can see
+in full (all-MiniLM-L6-v2 reads only ~256 word pieces per input), and a
+cached page matches only if every chunk is at least `threshold` similar.
+
+Opt-in from scraper.py with --semantic-cache.
+
+Requirements (optional - the cache disables itself if these are missing):
+    pip install sentence-transformers numpy
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+# Imported by SemanticCache() rather than here: sentence-transformers pulls
+# in torch, which takes seconds, and most runs never enable the cache
+np = None
+SentenceTransformer = None
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+# Text is embedded in chunks of this size - about what the model reads per input
+EMBED_CHUNK_CHARS = 1000
+
+# At most this many chunks are embedded (matches scraper.MAX_PROMPT_CHARS)
+MAX_EMBED_CHUNKS = 30
+
+
+def _import_dependencies() -> bool:
+    """Import numpy and sentence-transformers on first use; False if missing."""
+    global np, SentenceTransformer
+    if SentenceTransformer is None:
+        try:
+            import numpy
+            from sentence_transformers import SentenceTransformer as model_class
+        except ImportError:
+            return False
+        np, SentenceTransformer = numpy, model_class
+    return True
+
+
+class SemanticCache:
+    """SQLite-backed store of extraction results, looked up by text similarity."""
+
+    def __init__(self, sqlite_path: str, ttl_days: float = 7, threshold: float = 0.95,
+                 model_name: str = DEFAULT_MODEL):
+        self.ttl_seconds = int(ttl_days * 86400)
+        self.threshold = threshold
+        self.model_name = model_name
+        self.enabled = _import_dependencies()
+        self._model = None
+        self._pending = {}  # url -> embedding computed by get(), reused by set()
+
+        # Extraction runs in worker threads, so share one connection under a lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_chunks ("
+            "id INTEGER PRIMARY KEY, namespace TEXT, url TEXT, n_chunks INTEGER, "
+            "embeddings BLOB, locations TEXT, ts INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS page_chunks_namespace ON page_chunks (namespace)")
+        self.conn.commit()
+
+        if not self.enabled:
+            print("[WARN] sentence-transformers not installed - semantic cache disabled")
+
+    @staticmethod
+    def _namespace(url: str) -> str:
+        """Pages are only compared with earlier fetches of the same host + path."""
+        parsed = urlparse(url)
+        return f"{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+
+    def _embed(self, text: str):
+        """Unit-length embeddings of the text's chunks, one row per chunk."""
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        chunks = [text[i:i + EMBED_CHUNK_CHARS]
+                  for i in range(0, len(text), EMBED_CHUNK_CHARS)][:MAX_EMBED_CHUNKS] or [""]
+        emb = self._model.encode(chunks, normalize_embeddings=True)
+        return np.asarray(emb, dtype=np.float32).reshape(len(chunks), -1)
+
+    def get(self, url: str, text: str) -> Optional[list[dict]]:
+        """Return locations from the newest cached fetch of this page, if every chunk is close enough."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            emb = self._embed(text)
+            self._pending[url] = emb
+
+            rows = self.conn.execute(
+                "SELECT embeddings, locations FROM page_chunks "
+                "WHERE namespace = ? AND n_chunks = ? AND ts > ? ORDER BY ts DESC",
+                # ttl_days=0 leaves nothing fresh enough, i.e. always call Claude
+                (self._namespace(url), len(emb), int(time.time()) - self.ttl_seconds)
+            ).fetchall()
+
+        for embeddings, locations in rows:
+            cached = np.frombuffer(embeddings, dtype=np.float32).reshape(len(emb), -1)
+            # Chunk i against chunk i - one changed section is enough to miss
+            if (cached * emb).sum(axis=1).min() >= self.threshold:
+                return json.loads(locations)
+        return None
+
+    def set(self, url: str, text: str, locations: list[dict]):
+        """Store the locations extracted from a page."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            emb = self._pending.pop(url, None)
+            if emb is None:
+                emb = self._embed(text)
+            self.conn.execute(
+                "INSERT INTO page_chunks (namespace, url, n_chunks, embeddings, locations, ts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._namespace(url), url, len(emb), emb.tobytes(), json.dumps(locations), int(time.time()))
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -1,17 +1,17 @@
 #!/usr/bin/env python3
 """
-Restaurant Enrichment Script (Streaming + Threaded Version)
+Restaurant Enrichment Script (Streaming + Concurrent Version)
 Enriches restaurant data with Google Places API information.
 
 Memory-efficient: streams row-by-row instead of loading entire CSV into memory.
 Supports checkpointing for resumable runs on large datasets.
-Supports concurrent API calls with threading.
+Supports concurrent API calls with asyncio + httpx (HTTP/2).
 
 Usage:
     # Basic streaming (processes row by row)
     python enrich_restaurants_streaming.py --api-key YOUR_KEY --input resy_gda_usa.csv
     
-    # With 4 concurrent threads (recommended)
+    # With 4 concurrent requests (recommended)
     python enrich_restaurants_streaming.py --api-key YOUR_KEY --input resy_gda_usa.csv --threads 4
     
     # With checkpointing every 500 rows (resumable)
@@ -21,27 +21,32 @@ Usage:
     python enrich_restaurants_streaming.py --api-key YOUR_KEY --input resy_gda_usa.csv --resume
 
 Requirements:
-    pip install requests tqdm
+    pip install 'httpx[http2]' orjson tqdm
 """
 
 import argparse
+import asyncio
+import atexit
+import contextlib
 import csv
+import hashlib
 import json
 import os
+import random
+import sqlite3
 import sys
 import time
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict, Any, Iterator, List, Tuple
-from queue import Queue
+from operator import itemgetter
+from typing import Optional, Dict, Any, Iterable, Tuple
 
 try:
-    import requests
+    import httpx
 except ImportError:
-    print("Installing requests...")
-    os.system("pip install requests")
-    import requests
+    print("Installing httpx...")
+    os.system("pip install 'httpx[http2]'")
+    import httpx
 
 try:
     from tqdm import tqdm
@@ -50,65 +55,400 @@ except ImportError:
     os.system("pip install tqdm")
     from tqdm import tqdm
 
+try:
+    import orjson  # Optional - faster JSON parsing
+except ImportError:
+    orjson = None
+
+
+def loads_json(data):
+    """Parse JSON from str or bytes, with orjson when available."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps_json(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON, with orjson when available."""
+    return orjson.dumps(obj) if orjson else json.dumps(obj).encode('utf-8')
+
+
+# Retries for 429 / 5xx / network errors, with exponential backoff + jitter
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 30.0  # seconds
+
+# Most results the writer takes off the queue for one writerows() call
+WRITE_BATCH_SIZE = 100
+
+# Pulls the Places columns of an output row out of a search_restaurant() result,
+# in output order (C-level, so cheaper than indexing the dict field by field)
+place_columns = itemgetter('address', 'website', 'lat', 'lon',
+                           'place_id', 'google_maps_url', 'google_name')
+
+# Legacy API rate limiting comes back as a 200 with this body status
+LEGACY_RETRY_STATUSES = ("OVER_QUERY_LIMIT", "UNKNOWN_ERROR")
+
+
+class PlacesRequestError(Exception):
+    """A Places request still failed after all retries."""
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds form only)."""
+    try:
+        return max(float(headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff for the given retry attempt (0-based), with jitter."""
+    return min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+
+class TokenBucket:
+    """
+    Async token bucket shared by every worker.
+    
+    Admits requests at `rate` per second on average, with bursts of up to
+    `capacity`. Waiters queue on a lock, so they are admitted in order.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available, then take it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def penalize(self, seconds: float):
+        """Drain the bucket so nothing is admitted for `seconds` (e.g. after a 429).
+        
+        Refills up to now first, so time spent on the failed request isn't
+        credited later; overlapping penalties keep the longest, not the sum.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency cap that adapts to rate limiting.
+    
+    Allows up to `limit` requests in flight, starting at `max_limit`. Each
+    rate-limited response halves the limit (down to one); every
+    `ramp_after` consecutive successes raises it by one again.
+    """
+    
+    def __init__(self, max_limit: int, ramp_after: int = 100):
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.ramp_after = ramp_after
+        self.in_flight = 0
+        self.successes = 0
+        self.cond = asyncio.Condition()
+    
+    async def __aenter__(self):
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        return self
+    
+    async def __aexit__(self, *exc):
+        async with self.cond:
+            self.in_flight -= 1
+            self.cond.notify()
+    
+    def on_throttle(self):
+        """Halve the limit; requests already in flight finish normally."""
+        self.limit = max(1, self.limit // 2)
+        self.successes = 0
+    
+    async def on_success(self):
+        """Count a success, and widen the limit after a clean run of them."""
+        self.successes += 1
+        if self.successes >= self.ramp_after and self.limit < self.max_limit:
+            self.successes = 0
+            async with self.cond:
+                self.limit += 1
+                self.cond.notify()
+
+
+class RateMonitor:
+    """
+    Circuit breaker over recent responses.
+    
+    Rejected requests still count toward API quota, so retrying into a
+    throttled backend just burns budget. If more than `threshold` of the
+    responses in the last `window` seconds were 429/5xx (and there are at
+    least `min_samples` of them), every worker pauses for `cooldown` seconds.
+    """
+    
+    def __init__(self, window: float = 60, threshold: float = 0.2,
+                 cooldown: float = 30, min_samples: int = 20):
+        self.window = window
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.recent = deque()  # (timestamp, rejected)
+        self.rejected = 0
+        self.open = asyncio.Event()
+        self.open.set()
+    
+    async def wait(self):
+        """Block while the breaker is tripped."""
+        await self.open.wait()
+    
+    def record(self, rejected: bool):
+        """Record one response, tripping the breaker if too many were rejected."""
+        now = time.monotonic()
+        self.recent.append((now, rejected))
+        self.rejected += rejected
+        while self.recent and self.recent[0][0] < now - self.window:
+            self.rejected -= self.recent.popleft()[1]
+        
+        if (self.open.is_set() and len(self.recent) >= self.min_samples
+                and self.rejected / len(self.recent) > self.threshold):
+            tqdm.write(f"{self.rejected}/{len(self.recent)} recent requests rejected - "
+                       f"pausing all lookups for {self.cooldown:.0f}s")
+            self.open.clear()
+            self.recent.clear()
+            self.rejected = 0
+            asyncio.get_running_loop().call_later(self.cooldown, self.open.set)
+
+
+class LookupCache:
+    """
+    On-disk memo of Places lookups, so duplicate rows and re-runs are free.
+    
+    Stores both matches and definitive no-matches (as null). Inserts are
+    committed in batches of `commit_every`; call close() to commit the rest.
+    """
+    
+    def __init__(self, sqlite_path: str, commit_every: int = 100):
+        self.commit_every = commit_every
+        self.pending = 0
+        self.conn = sqlite3.connect(sqlite_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS places (key TEXT PRIMARY KEY, result TEXT)")
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(name: str, city: str, state: str, neighborhood: str, api: str) -> str:
+        """Case-insensitive key for a lookup with the given API ("new" or "legacy").
+        
+        The two APIs run different queries and legacy results have no
+        website, so their answers are kept apart.
+        """
+        raw = f"{api}|{name}|{city}|{state}|{neighborhood}".lower().encode()
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Return (hit, result) - result is None for a cached no-match."""
+        row = self.conn.execute("SELECT result FROM places WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        return True, loads_json(row[0])
+    
+    def set(self, key: str, result: Optional[Dict[str, Any]]):
+        """Store a lookup result (None for no match)."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO places (key, result) VALUES (?, ?)",
+            (key, dumps_json(result).decode('utf-8'))
+        )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.conn.commit()
+            self.pending = 0
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
 
 class GooglePlacesClient:
-    """Client for Google Places API"""
+    """
+    Async client for Google Places API.
+    
+    Use as ``async with GooglePlacesClient(...) as client:`` inside
+    run_async(). The HTTP/2 httpx client (and its connection pool) is shared
+    per API key at class level, so repeated runs in one process - e.g. a
+    loop over per-city files - reuse warm connections.
+    """
+    
+    _http_clients: Dict[Tuple[str, asyncio.AbstractEventLoop], httpx.AsyncClient] = {}
     
-    def __init__(self, api_key: str, use_legacy: bool = False):
+    def __init__(self, api_key: str, use_legacy: bool = False, num_threads: int = 1,
+                 rate_limiter: Optional[TokenBucket] = None, cache: Optional[LookupCache] = None):
         self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.cache_hits = 0
         self.use_legacy = use_legacy
+        self.num_threads = num_threads
         self.base_url = "https://places.googleapis.com/v1/places"
         self.search_url = f"{self.base_url}:searchText"
+        self.http = None
+        
+        # num_threads is the ceiling; back off below it while rate limited
+        self.concurrency = AdaptiveLimiter(num_threads)
+        self.monitor = RateMonitor()
+        
+        # Headers for the new API never change, so build them once
+        self.headers = {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": self.api_key,
+            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.location,places.websiteUri,places.googleMapsUri"
+        }
+    
+    async def __aenter__(self):
+        # HTTP/2 multiplexes every in-flight lookup over a few TLS connections.
+        # Connections are bound to their event loop, hence the loop in the key.
+        key = (self.api_key, asyncio.get_running_loop())
+        http = self._http_clients.get(key)
+        if http is None or http.is_closed:
+            http = httpx.AsyncClient(
+                http2=True,
+                timeout=10,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=50)
+            )
+            self._http_clients[key] = http
+        self.http = http
+        return self
+    
+    async def __aexit__(self, *exc):
+        pass  # The HTTP client outlives this object - see close_http_clients()
+    
+    @classmethod
+    async def close_http_clients(cls):
+        """Close the shared HTTP clients bound to the running loop."""
+        loop = asyncio.get_running_loop()
+        for key in [key for key in cls._http_clients if key[1] is loop]:
+            await cls._http_clients.pop(key).aclose()
+        
+    async def _request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """
+        Send a rate-limited request and return its parsed JSON body.
+        
+        429s, 5xx responses, legacy OVER_QUERY_LIMIT bodies and network errors
+        are retried with exponential backoff (honoring Retry-After), raising
+        PlacesRequestError once MAX_RETRIES is exhausted. Any other non-200
+        status (bad key, billing disabled, bad request) raises right away.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            await self.monitor.wait()
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            
+            wait = None
+            throttled = False
+            async with self.concurrency:
+                try:
+                    response = await self.http.request(method, url, **kwargs)
+                    if response.status_code == 200:
+                        data = loads_json(response.content)
+                        if not isinstance(data, dict):
+                            raise ValueError("JSON body is not an object")
+                        if data.get("status") not in LEGACY_RETRY_STATUSES:
+                            self.monitor.record(rejected=False)
+                            await self.concurrency.on_success()
+                            return data
+                        self.monitor.record(rejected=True)
+                        throttled = data["status"] == "OVER_QUERY_LIMIT"
+                    elif response.status_code == 429 or response.status_code >= 500:
+                        self.monitor.record(rejected=True)
+                        wait = retry_after_seconds(response.headers)
+                        throttled = response.status_code == 429
+                    else:
+                        self.monitor.record(rejected=False)
+                        raise PlacesRequestError(f"HTTP {response.status_code}")
+                except (httpx.HTTPError, ValueError):
+                    pass  # Network error or truncated body - retry
+            
+            if throttled:
+                self.concurrency.on_throttle()
+            if attempt == MAX_RETRIES:
+                break
+            if wait is None:
+                wait = backoff_seconds(attempt)
+            # Rate limited - hold back every worker, not just this one
+            if throttled and self.rate_limiter:
+                self.rate_limiter.penalize(wait)
+            await asyncio.sleep(wait)
+        
+        raise PlacesRequestError(f"failed after {MAX_RETRIES} retries")
+    
+    async def search_restaurant(self, name: str, city: str, state: str = "", neighborhood: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Search for a restaurant and return place details.
+        
+        Returns None only when the API answered with no results; raises
+        PlacesRequestError for anything else that isn't a match (HTTP or API
+        errors, malformed responses), so those are never cached.
+        """
+        cache_key = None
+        if self.cache:
+            api = 'legacy' if self.use_legacy else 'new'
+            cache_key = LookupCache.make_key(name, city, state, neighborhood, api)
+            hit, cached = self.cache.get(cache_key)
+            if hit:
+                self.cache_hits += 1
+                return cached
         
-    def search_restaurant(self, name: str, city: str, state: str = "", neighborhood: str = "") -> Optional[Dict[str, Any]]:
-        """Search for a restaurant and return place details."""
         if self.use_legacy:
-            return self._search_legacy(name, city, state, neighborhood)
-        return self._search_new(name, city, state, neighborhood)
+            result = await self._search_legacy(name, city, state, neighborhood)
+        else:
+            result = await self._search_new(name, city, state, neighborhood)
+        
+        # Errors raise before this, so only real answers are cached
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result
     
-    def _search_new(self, name: str, city: str, state: str = "", neighborhood: str = "") -> Optional[Dict[str, Any]]:
+    async def _search_new(self, name: str, city: str, state: str = "", neighborhood: str = "") -> Optional[Dict[str, Any]]:
         """New Places API (recommended)"""
         # Build search query
         location_parts = [p for p in [neighborhood, city, state] if p and p != city]
         location = ", ".join([city] + location_parts) if location_parts else city
         query = f"{name} restaurant in {location}"
         
-        headers = {
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": self.api_key,
-            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.location,places.websiteUri,places.googleMapsUri"
-        }
-        
         payload = {
             "textQuery": query,
             "maxResultCount": 1
         }
         
+        data = await self._request("POST", self.search_url, content=dumps_json(payload), headers=self.headers)
+        
+        if not data.get("places"):
+            return None  # Definitive "no results"
         try:
-            response = requests.post(self.search_url, headers=headers, json=payload, timeout=10)
-            
-            if response.status_code != 200:
-                return None
-                
-            data = response.json()
-            
-            if "places" in data and len(data["places"]) > 0:
-                place = data["places"][0]
-                return {
-                    "place_id": place.get("id", ""),
-                    "google_name": place.get("displayName", {}).get("text", ""),
-                    "address": place.get("formattedAddress", ""),
-                    "lat": place.get("location", {}).get("latitude", ""),
-                    "lon": place.get("location", {}).get("longitude", ""),
-                    "website": place.get("websiteUri", ""),
-                    "google_maps_url": place.get("googleMapsUri", "")
-                }
-            return None
-            
-        except Exception as e:
-            return None
+            place = data["places"][0]
+            return {
+                "place_id": place.get("id", ""),
+                "google_name": place.get("displayName", {}).get("text", ""),
+                "address": place.get("formattedAddress", ""),
+                "lat": place.get("location", {}).get("latitude", ""),
+                "lon": place.get("location", {}).get("longitude", ""),
+                "website": place.get("websiteUri", ""),
+                "google_maps_url": place.get("googleMapsUri", "")
+            }
+        except (AttributeError, IndexError, KeyError, TypeError) as e:
+            raise PlacesRequestError(f"malformed response: {e!r}") from e
     
-    def _search_legacy(self, name: str, city: str, state: str = "", neighborhood: str = "") -> Optional[Dict[str, Any]]:
+    async def _search_legacy(self, name: str, city: str, state: str = "", neighborhood: str = "") -> Optional[Dict[str, Any]]:
         """Legacy Places API fallback"""
         location_parts = [p for p in [neighborhood, city, state] if p and p != city]
         location = ", ".join([city] + location_parts) if location_parts else city
@@ -119,61 +459,144 @@ class GooglePlacesClient:
             "key": self.api_key
         }
         
+        data = await self._request(
+            "GET",
+            "https://maps.googleapis.com/maps/api/place/textsearch/json",
+            params=params
+        )
+        
+        status = data.get("status")
+        if status == "ZERO_RESULTS" or (status == "OK" and not data.get("results")):
+            return None  # Definitive "no results"
+        if status != "OK":
+            # REQUEST_DENIED, INVALID_REQUEST, ... - not an answer about this restaurant
+            raise PlacesRequestError(f"{status}: {data.get('error_message', '')}".rstrip(": "))
         try:
-            response = requests.get(
-                "https://maps.googleapis.com/maps/api/place/textsearch/json",
-                params=params,
-                timeout=10
-            )
-            data = response.json()
+            place = data["results"][0]
+            place_id = place.get("place_id", "")
             
-            if data.get("status") == "OK" and data.get("results"):
-                place = data["results"][0]
-                place_id = place.get("place_id", "")
-                
-                return {
-                    "place_id": place_id,
-                    "google_name": place.get("name", ""),
-                    "address": place.get("formatted_address", ""),
-                    "lat": place.get("geometry", {}).get("location", {}).get("lat", ""),
-                    "lon": place.get("geometry", {}).get("location", {}).get("lng", ""),
-                    "website": "",
-                    "google_maps_url": f"https://www.google.com/maps/place/?q=place_id:{place_id}" if place_id else ""
-                }
-            return None
-            
-        except Exception:
-            return None
-
-
-def count_lines(filename: str) -> int:
-    """Count lines in file for progress bar"""
-    with open(filename, 'r', encoding='utf-8') as f:
-        return sum(1 for _ in f) - 1  # Subtract header
+            return {
+                "place_id": place_id,
+                "google_name": place.get("name", ""),
+                "address": place.get("formatted_address", ""),
+                "lat": place.get("geometry", {}).get("location", {}).get("lat", ""),
+                "lon": place.get("geometry", {}).get("location", {}).get("lng", ""),
+                "website": "",
+                "google_maps_url": f"https://www.google.com/maps/place/?q=place_id:{place_id}" if place_id else ""
+            }
+        except (AttributeError, IndexError, KeyError, TypeError) as e:
+            raise PlacesRequestError(f"malformed response: {e!r}") from e
 
 
 def get_checkpoint_file(output_file: str) -> str:
     """Get checkpoint filename based on output file"""
+    return output_file.replace('.csv', '_checkpoint.log')
+
+
+def get_legacy_checkpoint_file(output_file: str) -> str:
+    """Checkpoint filename used before checkpoints became an append-only log"""
     return output_file.replace('.csv', '_checkpoint.json')
 
 
-def load_checkpoint(checkpoint_file: str) -> int:
-    """Load last processed row from checkpoint"""
-    if os.path.exists(checkpoint_file):
-        with open(checkpoint_file, 'r') as f:
-            data = json.load(f)
-            return data.get('last_row', 0)
-    return 0
+def load_legacy_checkpoint(checkpoint_file: str) -> int:
+    """Load last_row from an old single-object JSON checkpoint"""
+    if not os.path.exists(checkpoint_file):
+        return 0
+    with open(checkpoint_file, 'rb') as f:
+        return loads_json(f.read()).get('last_row', 0)
 
 
-def save_checkpoint(checkpoint_file: str, row_num: int, stats: dict):
-    """Save checkpoint with current progress"""
-    with open(checkpoint_file, 'w') as f:
-        json.dump({
-            'last_row': row_num,
-            'timestamp': datetime.now().isoformat(),
-            'stats': stats
-        }, f)
+def load_checkpoint(checkpoint_file: str) -> Tuple[int, set]:
+    """
+    Load (row to resume from, rows past it already written) from the last
+    complete line of the checkpoint log.
+    
+    Only the tail of the file is read, so this stays cheap however long the
+    log has grown. A line cut short by a crash is ignored.
+    """
+    if not os.path.exists(checkpoint_file):
+        return 0, set()
+    with open(checkpoint_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - 65536, 0))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        try:
+            checkpoint = loads_json(line)
+            return checkpoint['row'], set(checkpoint.get('done', ()))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    return 0, set()
+
+
+def save_checkpoint(log, completed: 'CompletedRows', stats: dict):
+    """
+    Append a checkpoint line to the open log and fsync it.
+    
+    'row' is the first row not yet completed - every row before it has
+    been written to the output files. Rows past it that finished out of
+    order are listed in 'done', so a resume doesn't write them twice.
+    """
+    checkpoint = {'row': completed.next_expected, 's': stats['success'], 'f': stats['failed']}
+    if completed.pending:
+        checkpoint['done'] = sorted(completed.pending)
+    log.write(dumps_json(checkpoint) + b'\n')
+    log.flush()
+    os.fsync(log.fileno())
+
+
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _close_loop():
+    """Close the shared HTTP clients, then the event loop they're bound to."""
+    _LOOP.run_until_complete(GooglePlacesClient.close_http_clients())
+    _LOOP.close()
+
+
+def run_async(coro):
+    """
+    Run a coroutine on the module's long-lived event loop.
+    
+    Unlike asyncio.run(), the loop isn't torn down after each call, so the
+    shared HTTP clients stay usable across runs. Ctrl-C cancels the
+    coroutine and lets its cleanup (final checkpoint) finish before
+    re-raising.
+    """
+    global _LOOP
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+        atexit.register(_close_loop)
+    
+    task = _LOOP.create_task(coro)
+    try:
+        return _LOOP.run_until_complete(task)
+    except KeyboardInterrupt:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            _LOOP.run_until_complete(task)
+        raise
+
+
+class CompletedRows:
+    """
+    Contiguous prefix of completed rows, for rows that finish out of order.
+    
+    next_expected is the first row not yet completed, so every row before
+    it is done and it is always safe to resume from.
+    """
+    
+    def __init__(self, start_row: int, done: Iterable[int] = ()):
+        self.next_expected = start_row
+        self.pending = set()  # completed rows past next_expected
+        for row_num in done:
+            self.add(row_num)
+    
+    def add(self, row_num: int):
+        self.pending.add(row_num)
+        while self.next_expected in self.pending:
+            self.pending.remove(self.next_expected)
+            self.next_expected += 1
 
 
 def enrich_restaurants_streaming(
@@ -186,79 +609,87 @@ def enrich_restaurants_streaming(
     checkpoint_interval: int = 0,
     resume: bool = False,
     limit: int = 0,
-    num_threads: int = 1
+    num_threads: int = 1,
+    flush_interval: int = 100,
+    use_cache: bool = True
 ):
     """
-    Stream-process restaurants with optional checkpointing and threading.
+    Stream-process restaurants with optional checkpointing and concurrency.
     
     Args:
         input_file: Path to input CSV
         output_file: Path to output enriched CSV
         failed_file: Path to save failed lookups
         api_key: Google API key
-        delay: Delay between API calls (seconds) - per thread
+        delay: Average delay between API calls (seconds) per concurrent slot;
+            sets the shared rate limit to num_threads / delay requests per second
         use_legacy: Use legacy Places API
         checkpoint_interval: Save checkpoint every N rows (0 = disabled)
         resume: Resume from last checkpoint
         limit: Stop after N rows (0 = no limit, useful for testing)
-        num_threads: Number of concurrent threads (default: 1)
+        num_threads: Number of concurrent requests (default: 1, values below 1 become 1)
+        flush_interval: Flush output files every N rows (default: 100)
+        use_cache: Reuse lookups from the on-disk cache next to the output file
     """
-    client = GooglePlacesClient(api_key, use_legacy=use_legacy)
+    # With no workers nothing would ever drain the row queue
+    num_threads = max(1, num_threads)
+    
+    # One bucket for all workers; same average rate the per-slot sleeps gave
+    rate = num_threads / delay if delay > 0 else 0
+    bucket = TokenBucket(rate, capacity=num_threads) if rate else None
+    cache = LookupCache(f"{output_file}.cache.db") if use_cache else None
+    client = GooglePlacesClient(api_key, use_legacy=use_legacy, num_threads=num_threads,
+                                rate_limiter=bucket, cache=cache)
     checkpoint_file = get_checkpoint_file(output_file)
     
     # Determine starting point
     start_row = 0
+    done_rows = set()
     if resume:
-        start_row = load_checkpoint(checkpoint_file)
-        if start_row > 0:
+        if os.path.exists(checkpoint_file):
+            start_row, done_rows = load_checkpoint(checkpoint_file)
+        else:
+            # Run started before checkpoints moved to the log - carry on from
+            # its JSON checkpoint rather than truncating its output
+            legacy_file = get_legacy_checkpoint_file(output_file)
+            start_row = load_legacy_checkpoint(legacy_file)
+            if start_row > 0:
+                print(f"Using legacy checkpoint {legacy_file}")
+        if start_row > 0 or done_rows:
             print(f"Resuming from row {start_row}")
     
-    # Count total rows for progress bar
-    total_rows = count_lines(input_file)
-    if limit > 0:
-        total_rows = min(total_rows, start_row + limit)
-    
     print(f"\nInput: {input_file}")
     print(f"Output: {output_file}")
-    print(f"Total rows: {total_rows}")
+    if limit > 0:
+        print(f"Row limit: {limit}")
     print(f"Starting from row: {start_row}")
     print(f"API: {'legacy' if use_legacy else 'new'} Places API")
-    print(f"Threads: {num_threads}")
-    print(f"Delay: {delay}s between requests (per thread)")
+    print(f"Concurrency: {num_threads}")
+    print(f"Rate limit: {f'{rate:.1f} requests/s' if rate else 'none'}")
     if checkpoint_interval:
         print(f"Checkpointing every {checkpoint_interval} rows")
+    if cache:
+        print(f"Lookup cache: {output_file}.cache.db")
     print("-" * 60)
     
-    # Use threaded version if num_threads > 1
-    if num_threads > 1:
-        stats = enrich_threaded(
+    try:
+        stats = run_async(enrich_async(
             input_file=input_file,
             output_file=output_file,
             failed_file=failed_file,
             client=client,
             start_row=start_row,
-            total_rows=total_rows,
-            delay=delay,
+            done_rows=done_rows,
             checkpoint_interval=checkpoint_interval,
             checkpoint_file=checkpoint_file,
             resume=resume,
             limit=limit,
-            num_threads=num_threads
-        )
-    else:
-        stats = enrich_sequential(
-            input_file=input_file,
-            output_file=output_file,
-            failed_file=failed_file,
-            client=client,
-            start_row=start_row,
-            total_rows=total_rows,
-            delay=delay,
-            checkpoint_interval=checkpoint_interval,
-            checkpoint_file=checkpoint_file,
-            resume=resume,
-            limit=limit
-        )
+            num_threads=num_threads,
+            flush_interval=flush_interval
+        ))
+    finally:
+        if cache:
+            cache.close()
     
     # Summary
     total_processed = stats['success'] + stats['failed']
@@ -268,222 +699,104 @@ def enrich_restaurants_streaming(
     print(f"Total processed: {total_processed}")
     print(f"Successfully enriched: {stats['success']} ({100*stats['success']/max(total_processed,1):.1f}%)")
     print(f"Failed lookups: {stats['failed']} ({100*stats['failed']/max(total_processed,1):.1f}%)")
+    if cache:
+        print(f"Served from cache: {client.cache_hits}")
     print(f"\nOutput saved to: {output_file}")
     print(f"Failed lookups saved to: {failed_file}")
     
     return stats
 
 
-def enrich_threaded(
+async def enrich_async(
     input_file: str,
     output_file: str,
     failed_file: str,
     client: GooglePlacesClient,
     start_row: int,
-    total_rows: int,
-    delay: float,
     checkpoint_interval: int,
     checkpoint_file: str,
     resume: bool,
     limit: int,
-    num_threads: int
+    num_threads: int,
+    flush_interval: int = 100,
+    done_rows: Iterable[int] = ()
 ) -> dict:
     """
-    Threaded enrichment using concurrent.futures.
-    Batches rows, processes in parallel, writes results in order.
+    Concurrent enrichment on asyncio.
+    A producer streams input rows into a bounded queue that num_threads
+    worker coroutines pull from, so memory stays O(num_threads) rows however
+    large the input is. One writer coroutine drains finished rows to the
+    output files, so no write locks are needed. Results may be written out
+    of order; done_rows are rows past start_row that a previous run already
+    wrote, and are skipped.
     """
     stats = {'success': 0, 'failed': 0, 'skipped': start_row}
-    
-    # Thread-safe locks for file writing
-    write_lock = threading.Lock()
-    stats_lock = threading.Lock()
+    done_rows = set(done_rows)
     
     # Determine write mode based on resume
-    write_mode = 'a' if resume and start_row > 0 else 'w'
-    write_header = not (resume and start_row > 0)
-    
-    # Read all rows we need to process (we need them for batching)
-    rows_to_process = []
-    with open(input_file, 'r', encoding='utf-8') as infile:
-        reader = csv.DictReader(infile)
-        input_fields = reader.fieldnames
-        
-        for row_num, row in enumerate(reader):
-            if row_num < start_row:
+    write_mode = 'a' if resume and (start_row > 0 or done_rows) else 'w'
+    
+    # Failed rows already on file, keyed by every column but the reason, so a
+    # re-resume doesn't append the same failure again
+    seen_failures = set()
+    if write_mode == 'a' and os.path.exists(failed_file):
+        with open(failed_file, 'r', newline='', encoding='utf-8') as f:
+            seen_failures.update(tuple(row[:-1]) for row in csv.reader(f))
+    
+    row_queue = asyncio.Queue(maxsize=num_threads * 4)
+    out_queue = asyncio.Queue(maxsize=num_threads * 4)
+    rows_read = 0
+    completed = CompletedRows(start_row, done_rows)  # rows written out
+    
+    async def produce_rows(reader):
+        """Stream rows to process into row_queue, then one sentinel per worker"""
+        nonlocal rows_read
+        # Blank lines are skipped without a row number, the way csv.DictReader
+        # (and so every older checkpoint) counts rows
+        rows = (row for row in reader if row)
+        for row_num, row in enumerate(rows):
+            if row_num < start_row or row_num in done_rows:
                 continue
-            if limit > 0 and (row_num - start_row) >= limit:
+            if limit > 0 and rows_read >= limit:
                 break
-            rows_to_process.append((row_num, row))
-    
-    # Detect format
-    is_resy_format = 'name' in input_fields and 'state' in input_fields
-    
-    if is_resy_format:
-        output_fields = ['name', 'city', 'state', 'country', 'address', 'website', 
-                       'lat', 'lon', 'place_id', 'google_maps_url', 'google_name']
-        failed_fields = ['name', 'city', 'state', 'country', 'reason']
-    else:
-        output_fields = ['City', 'Name', 'Cuisine', 'Neighborhood', 'Address', 'Website', 
-                       'Lat', 'Lon', 'Place_ID', 'Google_Maps_URL', 'Google_Name']
-        failed_fields = ['City', 'Name', 'Cuisine', 'Neighborhood', 'Reason']
-    
-    def process_row(row_data: Tuple[int, dict]) -> Tuple[int, dict, bool]:
-        """Process a single row - runs in thread"""
+            await row_queue.put((row_num, row))
+            rows_read += 1
+        for _ in range(num_threads):
+            await row_queue.put(None)
+    
+    async def process_row(row_data: Tuple[int, list]):
+        """Look up a single row and queue the result for the writer"""
         row_num, row = row_data
         
-        # Extract fields based on format
-        if is_resy_format:
-            name = row.get('name', '')
-            city = row.get('city', '')
-            state = row.get('state', '')
-            country = row.get('country', '')
-            neighborhood = ''
-            cuisine = ''
-        else:
-            name = row.get('Name', '')
-            city = row.get('City', '')
-            state = ''
-            country = 'USA'
-            neighborhood = row.get('Neighborhood', '')
-            cuisine = row.get('Cuisine', '')
+        # Format-specific extraction, chosen once from the header below
+        name, city, state, neighborhood, prefix = extract_fields(row)
         
-        # Rate limiting per thread
-        time.sleep(delay)
-        
-        # Search Google Places
-        result = client.search_restaurant(name, city, state, neighborhood)
+        # Search Google Places (rate limited by the client's shared bucket)
+        reason = 'Not found in Google Places'
+        try:
+            result = await client.search_restaurant(name, city, state, neighborhood)
+        except PlacesRequestError as e:
+            result = None
+            reason = f'Request failed ({e})'
         
         if result:
-            if is_resy_format:
-                enriched_row = {
-                    'name': name,
-                    'city': city,
-                    'state': state,
-                    'country': country,
-                    'address': result['address'],
-                    'website': result['website'],
-                    'lat': result['lat'],
-                    'lon': result['lon'],
-                    'place_id': result['place_id'],
-                    'google_maps_url': result['google_maps_url'],
-                    'google_name': result['google_name']
-                }
-            else:
-                enriched_row = {
-                    'City': city,
-                    'Name': name,
-                    'Cuisine': cuisine,
-                    'Neighborhood': neighborhood,
-                    'Address': result['address'],
-                    'Website': result['website'],
-                    'Lat': result['lat'],
-                    'Lon': result['lon'],
-                    'Place_ID': result['place_id'],
-                    'Google_Maps_URL': result['google_maps_url'],
-                    'Google_Name': result['google_name']
-                }
-            return (row_num, enriched_row, True)
+            await out_queue.put((row_num, prefix + place_columns(result), True))
         else:
-            if is_resy_format:
-                failed_row = {
-                    'name': name,
-                    'city': city,
-                    'state': state,
-                    'country': country,
-                    'reason': 'Not found in Google Places'
-                }
-            else:
-                failed_row = {
-                    'City': city,
-                    'Name': name,
-                    'Cuisine': cuisine,
-                    'Neighborhood': neighborhood,
-                    'Reason': 'Not found in Google Places'
-                }
-            return (row_num, failed_row, False)
-    
-    # Open output files
-    with open(output_file, write_mode, newline='', encoding='utf-8') as outfile, \
-         open(failed_file, write_mode, newline='', encoding='utf-8') as failfile:
-        
-        writer = csv.DictWriter(outfile, fieldnames=output_fields)
-        fail_writer = csv.DictWriter(failfile, fieldnames=failed_fields)
-        
-        if write_header:
-            writer.writeheader()
-            fail_writer.writeheader()
-        
-        # Process with thread pool
-        pbar = tqdm(total=len(rows_to_process), desc=f"Enriching ({num_threads} threads)", unit="restaurants")
-        
-        with ThreadPoolExecutor(max_workers=num_threads) as executor:
-            # Submit all tasks
-            futures = {executor.submit(process_row, row_data): row_data for row_data in rows_to_process}
-            
-            processed_count = 0
-            for future in as_completed(futures):
-                row_num, result_row, success = future.result()
-                
-                with write_lock:
-                    if success:
-                        writer.writerow(result_row)
-                        outfile.flush()
-                    else:
-                        fail_writer.writerow(result_row)
-                        failfile.flush()
-                
-                with stats_lock:
-                    if success:
-                        stats['success'] += 1
-                    else:
-                        stats['failed'] += 1
-                    processed_count += 1
-                    
-                    # Checkpoint
-                    if checkpoint_interval and processed_count % checkpoint_interval == 0:
-                        save_checkpoint(checkpoint_file, start_row + processed_count, stats)
-                
-                pbar.update(1)
-                pbar.set_postfix({'✓': stats['success'], '✗': stats['failed']})
-        
-        pbar.close()
-    
-    # Final checkpoint
-    if checkpoint_interval:
-        save_checkpoint(checkpoint_file, start_row + len(rows_to_process), stats)
-    
-    return stats
-
-
-def enrich_sequential(
-    input_file: str,
-    output_file: str,
-    failed_file: str,
-    client: GooglePlacesClient,
-    start_row: int,
-    total_rows: int,
-    delay: float,
-    checkpoint_interval: int,
-    checkpoint_file: str,
-    resume: bool,
-    limit: int
-) -> dict:
-    """Original sequential (single-threaded) enrichment."""
-    stats = {'success': 0, 'failed': 0, 'skipped': start_row}
+            await out_queue.put((row_num, prefix + (reason,), False))
     
-    # Determine write mode based on resume
-    write_mode = 'a' if resume and start_row > 0 else 'w'
-    write_header = not (resume and start_row > 0)
-    
-    # Define output fieldnames based on input structure
-    # We'll detect these from the input file
+    async def worker():
+        """Pull rows until the producer's sentinel"""
+        while (item := await row_queue.get()) is not None:
+            await process_row(item)
     
     with open(input_file, 'r', encoding='utf-8') as infile, \
          open(output_file, write_mode, newline='', encoding='utf-8') as outfile, \
-         open(failed_file, write_mode, newline='', encoding='utf-8') as failfile:
+         open(failed_file, write_mode, newline='', encoding='utf-8') as failfile, \
+         (open(checkpoint_file, write_mode + 'b') if checkpoint_interval
+          else contextlib.nullcontext()) as checkpoint_log:
         
-        reader = csv.DictReader(infile)
-        input_fields = reader.fieldnames
+        reader = csv.reader(infile)
+        input_fields = next(reader, [])
         
         # Detect input format (Chase vs Resy)
         # Chase format: City, Name, Cuisine, Neighborhood
@@ -499,129 +812,146 @@ def enrich_sequential(
                            'Lat', 'Lon', 'Place_ID', 'Google_Maps_URL', 'Google_Name']
             failed_fields = ['City', 'Name', 'Cuisine', 'Neighborhood', 'Reason']
         
-        writer = csv.DictWriter(outfile, fieldnames=output_fields)
-        fail_writer = csv.DictWriter(failfile, fieldnames=failed_fields)
-        
-        if write_header:
-            writer.writeheader()
-            fail_writer.writeheader()
-        
-        # Process rows with progress bar
-        pbar = tqdm(total=total_rows - start_row, desc="Enriching", unit="restaurants")
+        # Column positions, resolved once from the header; a missing column
+        # gets an index past the end of any row and reads as ''
+        column = {field: i for i, field in enumerate(input_fields)}
+        missing = len(input_fields)
+        width = missing + 1
         
-        for row_num, row in enumerate(reader):
-            # Skip already processed rows
-            if row_num < start_row:
-                continue
-            
-            # Check limit
-            if limit > 0 and (row_num - start_row) >= limit:
-                break
-            
-            # Extract fields based on format
-            if is_resy_format:
-                name = row.get('name', '')
-                city = row.get('city', '')
-                state = row.get('state', '')
-                country = row.get('country', '')
-                neighborhood = ''
-                cuisine = ''
-            else:
-                name = row.get('Name', '')
-                city = row.get('City', '')
-                state = ''
-                country = 'USA'
-                neighborhood = row.get('Neighborhood', '')
-                cuisine = row.get('Cuisine', '')
+        # extract_fields(row) -> (name, city, state, neighborhood, prefix),
+        # where prefix is the row's leading output columns (shared by the
+        # enriched and failed files, which differ only in what follows)
+        if is_resy_format:
+            name_idx = column.get('name', missing)
+            city_idx = column.get('city', missing)
+            state_idx = column.get('state', missing)
+            country_idx = column.get('country', missing)
             
-            # Search Google Places
-            result = client.search_restaurant(name, city, state, neighborhood)
+            def extract_fields(row):
+                if len(row) < width:
+                    row = row + [''] * (width - len(row))
+                name, city, state = row[name_idx], row[city_idx], row[state_idx]
+                return name, city, state, '', (name, city, state, row[country_idx])
+        else:
+            name_idx = column.get('Name', missing)
+            city_idx = column.get('City', missing)
+            neighborhood_idx = column.get('Neighborhood', missing)
+            cuisine_idx = column.get('Cuisine', missing)
             
-            if result:
-                if is_resy_format:
-                    enriched_row = {
-                        'name': name,
-                        'city': city,
-                        'state': state,
-                        'country': country,
-                        'address': result['address'],
-                        'website': result['website'],
-                        'lat': result['lat'],
-                        'lon': result['lon'],
-                        'place_id': result['place_id'],
-                        'google_maps_url': result['google_maps_url'],
-                        'google_name': result['google_name']
-                    }
-                else:
-                    enriched_row = {
-                        'City': city,
-                        'Name': name,
-                        'Cuisine': cuisine,
-                        'Neighborhood': neighborhood,
-                        'Address': result['address'],
-                        'Website': result['website'],
-                        'Lat': result['lat'],
-                        'Lon': result['lon'],
-                        'Place_ID': result['place_id'],
-                        'Google_Maps_URL': result['google_maps_url'],
-                        'Google_Name': result['google_name']
-                    }
-                writer.writerow(enriched_row)
-                outfile.flush()  # Ensure row is written immediately
-                stats['success'] += 1
-            else:
-                if is_resy_format:
-                    failed_row = {
-                        'name': name,
-                        'city': city,
-                        'state': state,
-                        'country': country,
-                        'reason': 'Not found in Google Places'
-                    }
-                else:
-                    failed_row = {
-                        'City': city,
-                        'Name': name,
-                        'Cuisine': cuisine,
-                        'Neighborhood': neighborhood,
-                        'Reason': 'Not found in Google Places'
-                    }
-                fail_writer.writerow(failed_row)
-                failfile.flush()
-                stats['failed'] += 1
+            def extract_fields(row):
+                if len(row) < width:
+                    row = row + [''] * (width - len(row))
+                name, city, neighborhood = row[name_idx], row[city_idx], row[neighborhood_idx]
+                return name, city, '', neighborhood, (city, name, row[cuisine_idx], neighborhood)
+        
+        writer = csv.writer(outfile)
+        fail_writer = csv.writer(failfile)
+        
+        # Write headers to any file that is still empty - including one left
+        # empty by a run that died before writing anything
+        if os.path.getsize(output_file) == 0:
+            writer.writerow(output_fields)
+        if os.path.getsize(failed_file) == 0:
+            fail_writer.writerow(failed_fields)
+        
+        # Total is unknown without a pre-pass, unless a limit was given
+        pbar = tqdm(total=limit or None, desc=f"Enriching ({num_threads} concurrent)", unit="restaurants")
+        
+        async def write_results():
+            """
+            Single writer - the only coroutine touching the output files.
+            Waits for one result, then takes every other result already
+            queued and writes them with one writerows() per file.
+            """
+            processed_count = 0
+            done = False
+            while not done:
+                batch = [await out_queue.get()]
+                while len(batch) < WRITE_BATCH_SIZE and not out_queue.empty():
+                    batch.append(out_queue.get_nowait())
+                if batch[-1] is None:  # Sentinel - always the last item queued
+                    batch.pop()
+                    done = True
+                
+                enriched_rows = []
+                failed_rows = []
+                failed_count = 0
+                for row_num, result_row, success in batch:
+                    completed.add(row_num)
+                    if success:
+                        enriched_rows.append(result_row)
+                        continue
+                    failed_count += 1
+                    failure_key = result_row[:-1]
+                    if failure_key not in seen_failures:
+                        seen_failures.add(failure_key)
+                        failed_rows.append(result_row)
+                writer.writerows(enriched_rows)
+                fail_writer.writerows(failed_rows)
+                stats['success'] += len(enriched_rows)
+                stats['failed'] += failed_count
+                
+                previous_count = processed_count
+                processed_count += len(batch)
+                
+                # Flush periodically rather than per row
+                if processed_count // flush_interval != previous_count // flush_interval:
+                    outfile.flush()
+                    failfile.flush()
+                
+                # Checkpoint - only rows already on disk count as done
+                if checkpoint_interval and processed_count // checkpoint_interval != previous_count // checkpoint_interval:
+                    outfile.flush()
+                    failfile.flush()
+                    save_checkpoint(checkpoint_log, completed, stats)
+                
+                pbar.update(len(batch))
+                pbar.set_postfix({'✓': stats['success'], '✗': stats['failed']})
+        
+        writer_task = asyncio.create_task(write_results())
+        tasks = [asyncio.create_task(produce_rows(reader))]
+        tasks += [asyncio.create_task(worker()) for _ in range(num_threads)]
+        tasks.append(writer_task)
+        try:
+            async with client:
+                await asyncio.gather(*tasks[:-1])
+                await out_queue.put(None)
+                await writer_task
+        finally:
+            # gather() doesn't cancel the others when one fails, so stop them
+            # here - otherwise they'd resume on the next run_async() call, and
+            # the writer would touch files about to be closed
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
             
-            # Checkpoint
-            if checkpoint_interval and (row_num + 1) % checkpoint_interval == 0:
-                save_checkpoint(checkpoint_file, row_num + 1, stats)
-                pbar.set_postfix({'✓': stats['success'], '✗': stats['failed'], 'saved': row_num + 1})
+            outfile.flush()
+            failfile.flush()
             
-            pbar.update(1)
+            # Final checkpoint - also on Ctrl-C or a crash, so --resume picks
+            # up right after the last row that made it to disk
+            if checkpoint_interval:
+                save_checkpoint(checkpoint_log, completed, stats)
             
-            # Rate limiting
-            time.sleep(delay)
-        
-        pbar.close()
-    
-    # Final checkpoint
-    if checkpoint_interval:
-        save_checkpoint(checkpoint_file, row_num + 1, stats)
+            pbar.close()
     
     return stats
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Enrich restaurant data with Google Places API (streaming + threaded)",
+        description="Enrich restaurant data with Google Places API (streaming + concurrent)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
     # Basic streaming enrichment (single-threaded)
     python enrich_restaurants_streaming.py --api-key YOUR_KEY --input resy_gda_usa.csv
     
-    # With 4 concurrent threads (4x faster!)
+    # With 4 concurrent requests (4x faster!)
     python enrich_restaurants_streaming.py --api-key YOUR_KEY --input resy_gda_usa.csv --threads 4
     
-    # With checkpointing + threading (recommended for large files)
+    # With checkpointing + concurrency (recommended for large files)
     python enrich_restaurants_streaming.py --api-key YOUR_KEY --input resy_gda_usa.csv --checkpoint 500 --threads 4
     
     # Resume from last checkpoint after interruption
@@ -630,9 +960,10 @@ Examples:
     # Test with first 100 rows
     python enrich_restaurants_streaming.py --api-key YOUR_KEY --input resy_gda_usa.csv --limit 100 --threads 4
 
-Threading notes:
-    - Google Places API supports 6000 QPM, so 4 threads is very safe
-    - 4 threads at 0.1s delay: ~4 min for 10K rows (vs ~17 min single-threaded)
+Concurrency notes:
+    - Requests run concurrently on asyncio; --threads sets how many are in flight
+    - Google Places API supports 6000 QPM, so 4 concurrent requests is very safe
+    - 4 concurrent at 0.1s delay: ~4 min for 10K rows (vs ~17 min one at a time)
     - Results may write out of order, but all data is captured
 
 Supports both input formats:
@@ -645,14 +976,17 @@ Supports both input formats:
     parser.add_argument("--input", required=True, help="Input CSV file")
     parser.add_argument("--output", default=None, help="Output CSV (default: input_enriched.csv)")
     parser.add_argument("--failed", default=None, help="Failed lookups CSV (default: input_failed.csv)")
-    parser.add_argument("--delay", type=float, default=0.1, help="Delay between API calls (default: 0.1s)")
+    parser.add_argument("--delay", type=float, default=0.1, help="Delay between API calls per concurrent request; sets the shared rate limit to threads/delay per second (default: 0.1s)")
     parser.add_argument("--legacy", action="store_true", help="Use legacy Places API")
     parser.add_argument("--checkpoint", type=int, default=0, help="Save checkpoint every N rows (default: disabled)")
     parser.add_argument("--resume", action="store_true", help="Resume from last checkpoint")
     parser.add_argument("--limit", type=int, default=0, help="Process only first N rows (for testing)")
-    parser.add_argument("--threads", type=int, default=1, help="Number of concurrent threads (default: 1, recommended: 4)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't write the on-disk lookup cache (OUTPUT.cache.db)")
+    parser.add_argument("--threads", type=int, default=1, help="Number of concurrent requests (default: 1, recommended: 4)")
     
     args = parser.parse_args()
+    if args.threads < 1:
+        parser.error("--threads must be at least 1")
     
     # Default output filenames
     base = os.path.splitext(args.input)[0]
@@ -678,7 +1012,8 @@ Supports both input formats:
         checkpoint_interval=args.checkpoint,
         resume=args.resume,
         limit=args.limit,
-        num_threads=args.threads
+        num_threads=args.threads,
+        use_cache=not args.no_cache
     )
     
     print(f"\nEnd time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")